@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark for fix_theme_styles.py over synthetic TSX components.
+
+Generates components of increasing size, StyleSheet.create block count and
+nesting depth, in each of the three useTenantTheme() shapes the codemod
+understands, and measures transform_source throughput (files/s, MB/s) and
+peak memory. Results can be saved as a baseline and compared against later.
+
+Usage:
+    python bench_fix_theme_styles.py [--quick] [--save-baseline FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from fix_theme_styles import FIXED, transform_source
+
+THEME_SHAPES = {
+    'destructured': '  const { theme } = useTenantTheme();\n',
+    'direct': '  const theme = useTenantTheme();\n',
+    'aliased': (
+        '  const { theme: tenantTheme } = useTenantTheme();\n'
+        '  const theme = tenantTheme;\n'
+        '  const notify = useNotification();\n'
+    ),
+}
+
+SIZES = (100, 1000, 5000)
+BLOCK_COUNTS = (1, 4)
+DEPTHS = (1, 8)
+
+QUICK_SIZES = (100, 1000)
+QUICK_BLOCK_COUNTS = (1,)
+QUICK_DEPTHS = (1,)
+
+
+def _style_entry(name, depth):
+    """One style key whose value nests ``depth`` objects deep."""
+    inner = "color: theme.colors.primary, label: 'a { b } c'"
+    for level in range(depth - 1):
+        inner = f'level{level}: {{ {inner} }}'
+    return f'    {name}: {{\n      padding: theme.spacing.md,\n      {inner},\n    }},\n'
+
+
+def _jsx_tree(depth, index):
+    """A JSX element nested ``depth`` views deep, with strings and comments to skip."""
+    opening = ''.join(f'{"  " * (level + 3)}<View style={{styles.item{index}}}>\n' for level in range(depth))
+    body = f'{"  " * (depth + 3)}<Text>{{`Item ${{{index} + 1}}`}} - it\'s {{/* }} */}} fine</Text>\n'
+    closing = ''.join(f'{"  " * (level + 3)}</View>\n' for level in reversed(range(depth)))
+    return opening + body + closing
+
+
+def make_component(shape, lines, blocks=1, depth=1):
+    """Build a component of roughly ``lines`` lines that transform_source can fix."""
+    header = (
+        "import React from 'react';\n"
+        "import { View, Text, StyleSheet } from 'react-native';\n"
+        "import { useTenantTheme } from '../../context/TenantThemeContext';\n"
+        "\n"
+        "const BenchScreen: React.FC = () => {\n"
+        f"{THEME_SHAPES[shape]}"
+    )
+
+    parts = [header]
+    # Half of the lines go to style blocks (4 lines per entry), half to JSX
+    half = max(1, (lines - 20) // 2)
+    entries_per_block = max(1, half // (4 * blocks))
+    jsx_items = max(1, half // (2 * depth + 1))
+
+    for block in range(blocks):
+        name = 'styles' if block == 0 else f'extraStyles{block}'
+        entries = ''.join(_style_entry(f'item{block}_{i}', depth) for i in range(entries_per_block))
+        parts.append(f'\n  const {name} = StyleSheet.create({{\n{entries}  }});\n')
+
+    parts.append('\n  return (\n    <View style={styles.item0_0}>\n')
+    parts.extend(_jsx_tree(depth, i) for i in range(jsx_items))
+    parts.append('    </View>\n  );\n};\n\nexport default BenchScreen;\n')
+    return ''.join(parts)
+
+
+def _measure(source, min_seconds):
+    """Run transform_source repeatedly for at least ``min_seconds``; return (runs, seconds)."""
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while runs == 0 or elapsed < min_seconds:
+        transform_source(source)
+        runs += 1
+        elapsed = time.perf_counter() - start
+    return runs, elapsed
+
+
+def _peak_memory(source):
+    """Peak bytes allocated by one transform_source call."""
+    tracemalloc.start()
+    try:
+        transform_source(source)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(sizes, block_counts, depths, min_seconds=0.2):
+    results = []
+    for shape in THEME_SHAPES:
+        for lines in sizes:
+            for blocks in block_counts:
+                for depth in depths:
+                    source = make_component(shape, lines, blocks, depth)
+                    _, status = transform_source(source)
+                    if status != FIXED:
+                        print(f"⚠️  {shape}/{lines}/{blocks}/{depth}: codemod returned {status}", file=sys.stderr)
+
+                    runs, seconds = _measure(source, min_seconds)
+                    size = len(source.encode('utf-8'))
+                    results.append({
+                        'case': f'{shape}-l{lines}-b{blocks}-d{depth}',
+                        'shape': shape,
+                        'lines': source.count('\n'),
+                        'blocks': blocks,
+                        'depth': depth,
+                        'bytes': size,
+                        'status': status,
+                        'files_per_second': runs / seconds,
+                        'mb_per_second': runs * size / seconds / 1e6,
+                        'peak_bytes': _peak_memory(source),
+                    })
+    return results
+
+
+def print_results(results, baseline=None):
+    previous = {row['case']: row for row in baseline['results']} if baseline else {}
+    print(f"{'case':<28}{'lines':>7}{'KB':>8}{'files/s':>11}{'MB/s':>8}{'peak KB':>9}{'vs base':>9}")
+    for row in results:
+        base = previous.get(row['case'])
+        ratio = f"{row['files_per_second'] / base['files_per_second']:.2f}x" if base else '-'
+        print(
+            f"{row['case']:<28}{row['lines']:>7}{row['bytes'] / 1024:>8.1f}"
+            f"{row['files_per_second']:>11.1f}{row['mb_per_second']:>8.2f}"
+            f"{row['peak_bytes'] / 1024:>9.1f}{ratio:>9}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark fix_theme_styles.transform_source.")
+    parser.add_argument('--quick', action='store_true', help="Run a small subset of cases")
+    parser.add_argument(
+        '--min-time', type=float, default=0.2, metavar='SECONDS',
+        help="Minimum measuring time per case (default: 0.2)",
+    )
+    parser.add_argument('--save-baseline', metavar='FILE', help="Write the results to FILE as JSON")
+    parser.add_argument('--compare', metavar='FILE', help="Show throughput relative to a saved baseline")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    if args.quick:
+        results = run_benchmarks(QUICK_SIZES, QUICK_BLOCK_COUNTS, QUICK_DEPTHS, args.min_time)
+    else:
+        results = run_benchmarks(SIZES, BLOCK_COUNTS, DEPTHS, args.min_time)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'results': results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
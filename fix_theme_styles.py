@@ -3,86 +3,705 @@
 Script to fix 'theme is not defined' errors by converting static StyleSheets to dynamic ones.
 """
 
+import argparse
+import ctypes
+import ctypes.util
+import difflib
+import glob
+import hashlib
+import json
+import os
 import re
+import select
+import shutil
+import string
+import struct
+import subprocess
 import sys
+import tempfile
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from fnmatch import fnmatch
+from functools import partial
+from multiprocessing import Pool
+
+# Per-file outcomes reported by _fix_styles_file
+FIXED = 'fixed'
+ALREADY_FIXED = 'already_fixed'
+NO_CHANGES = 'no_changes'
+MISSING_THEME = 'missing_theme'
+MISSING_STYLES = 'missing_styles'
+MISSING_COMPONENT_END = 'missing_component_end'
+USES_COMPONENT_LOCALS = 'uses_component_locals'
+ERROR = 'error'
+
+STATUS_MESSAGES = {
+    FIXED: '✓ {} - Fixed successfully',
+    ALREADY_FIXED: '✓ {} - Already has createStyles call',
+    NO_CHANGES: '- {} - No changes needed',
+    MISSING_THEME: '✗ {} - Could not find useTenantTheme() pattern',
+    MISSING_STYLES: '✗ {} - Could not find StyleSheet.create block',
+    MISSING_COMPONENT_END: '✗ {} - Could not find component end',
+    USES_COMPONENT_LOCALS: '✗ {} - StyleSheet.create block uses component state or props',
+    ERROR: '✗ {} - Error: {}',
+}
+
+PATTERN_MISSING = (MISSING_THEME, MISSING_STYLES, MISSING_COMPONENT_END)
+
+DRY_RUN_MESSAGES = dict(STATUS_MESSAGES, **{FIXED: '✓ {} - Would be fixed'})
+
+GLOB_CHARS = ('*', '?', '[')
+
+# Bump whenever a rewrite rule changes so cached outcomes are discarded
+# (adding or removing a rule invalidates the cache on its own)
+RULES_VERSION = 3
+DEFAULT_CACHE_FILE = '.fix_theme_styles_cache.json'
+DEFAULT_INDEX_FILE = '.theme_usage_index.json'
+
+# Outcomes that stay valid for as long as the file content does not change
+CACHEABLE = (ALREADY_FIXED, NO_CHANGES, USES_COMPONENT_LOCALS) + PATTERN_MISSING
+
+
+# Statements that introduce `theme`, matched in one go against the
+# useTenantTheme() statement found by scan_source. The matching group
+# names the lines to add after it.
+THEME_STATEMENT = re.compile(
+    r'(?P<destructured>const \{ theme \} = useTenantTheme\(\);)'
+    r'|(?P<direct>const theme = useTenantTheme\(\);)'
+    r'|(?P<aliased>const \{ theme: tenantTheme \} = useTenantTheme\(\);)'
+)
+
+THEME_INSERTS = {
+    'destructured': ['const styles = createStyles(theme);'],
+    'direct': ['const styles = createStyles(theme.theme);'],
+    'aliased': ['const theme = tenantTheme;', 'const notify = useNotification();', 'const styles = createStyles(theme);'],
+}
+
+TENANT_ALIAS_PATTERN = re.compile(r'\n[ \t]*const theme = tenantTheme;\n[ \t]*const notify = useNotification\(\);')
+
+SourceScan = namedtuple('SourceScan', ['component', 'theme_call', 'styles'])
+
+# A rewrite rule: applied to a file when any of its literal anchors occurs
+# in it. ``apply(content, timings=None)`` returns (new_content, status);
+# ``unmatched`` is the status reported when none of the anchors occur.
+Rule = namedtuple('Rule', ['name', 'anchors', 'apply', 'unmatched'])
+
+RULES = []
+_prefilter = None
+
+# Outcome of one file in a run, as handed from a worker to the parent
+FileResult = namedtuple('FileResult', ['filepath', 'status', 'detail', 'fingerprint', 'payload', 'size', 'timings'])
+
+# Per-file stages timed for --report json, in pipeline order
+STAGES = ('read', 'prefilter', 'scan', 'rewrite', 'diff', 'write')
+
+IDENT_START = frozenset(string.ascii_letters + '_$')
+IDENT_CHARS = IDENT_START | frozenset(string.digits)
+CLOSERS = {'{': '}', '(': ')', '[': ']'}
+# A '/' after one of these starts a regex literal rather than a division
+REGEX_PREFIX = frozenset('(,=:[!&|?{;+-*%~^')
+
+CALL_OPEN = re.compile(r'[ \t]*\(')
+STYLES_CALL = re.compile(r'\.create\s*\(\s*\{')
+STYLES_DECL = re.compile(r'[ \t]*const styles\s*=\s*$')
+SEMICOLON = re.compile(r'[ \t]*;')
+
+# Names a styles body can use once it is moved out of the component, besides
+# `theme` and its module's own bindings: literals, keywords and globals
+STYLE_GLOBALS = frozenset((
+    'true false null undefined NaN Infinity this typeof instanceof in of new void as const any '
+    'Math Number String Boolean Object Array JSON Date parseInt parseFloat isNaN isFinite '
+    'console window global globalThis __DEV__'
+).split())
+# Keywords introducing a module-level binding (with `import`)
+DECLARATION_KEYWORDS = frozenset(('const', 'let', 'var', 'function', 'class', 'enum', 'type', 'interface'))
+
+
+def _skip_string(content, i, quote):
+    """Return the index just past the '/" string starting at ``i``.
+
+    Strings cannot span lines, so an unterminated quote (an apostrophe in
+    JSX text) only swallows the rest of its line.
+    """
+    n = len(content)
+    j = i + 1
+    while j < n:
+        c = content[j]
+        if c == '\\':
+            j += 2
+        elif c == quote:
+            return j + 1
+        elif c == '\n':
+            return j
+        else:
+            j += 1
+    return n
+
+
+def _skip_template(content, i, expressions=None):
+    """Return the index just past the template literal starting at ``i``.
+
+    If ``expressions`` is a list, the (start, end) span of each top-level
+    ${...} expression is appended to it.
+    """
+    n = len(content)
+    j = i + 1
+    while j < n:
+        c = content[j]
+        if c == '\\':
+            j += 2
+        elif c == '`':
+            return j + 1
+        elif c == '$' and content.startswith('{', j + 1):
+            # ${...} expression: skip to its matching brace
+            depth = 1
+            j += 2
+            expr_start = j
+            while j < n and depth:
+                c = content[j]
+                if c in '\'"':
+                    j = _skip_string(content, j, c)
+                elif c == '`':
+                    j = _skip_template(content, j)
+                else:
+                    if c == '{':
+                        depth += 1
+                    elif c == '}':
+                        depth -= 1
+                    j += 1
+            if expressions is not None:
+                expressions.append((expr_start, j - 1 if not depth else j))
+        else:
+            j += 1
+    return n
+
+
+def _skip_regex(content, i):
+    """Return the index just past the regex literal at ``i``, or ``i + 1`` if it is not one."""
+    n = len(content)
+    j = i + 1
+    in_class = False
+    while j < n:
+        c = content[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            return i + 1
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            j += 1
+            while j < n and content[j] in IDENT_CHARS:
+                j += 1
+            return j
+        j += 1
+    return i + 1
+
+
+def scan_source(content):
+    """Walk a TSX source once and locate the spans fix_styles_file needs.
+
+    Skips string, template and regex literals and comments while tracking
+    bracket depth, so the result does not depend on indentation. Returns a
+    SourceScan whose fields are None when not found:
+
+    - theme_call: (start, end) of the first useTenantTheme() statement,
+      from the start of its line to just past its semicolon
+    - styles: (start, end, body_start, body_end) of the first
+      ``const styles = StyleSheet.create({...});`` nested inside a function,
+      starting at the newline before it, plus the object body span
+    - component: (start, end) of the top-level statement enclosing the
+      useTenantTheme() call, ending past its closing bracket and semicolon
+    """
+    n = len(content)
+    i = 0
+    line_start = 0
+    prev = ''
+    stack = []  # (closing char, tag)
+    top_open = 0
+
+    theme_call = None
+    theme_start = theme_depth = None
+    component_start = None
+    component = None
+    styles = None
+    styles_start = body_start = body_end = None
+
+    while i < n:
+        c = content[i]
+
+        if c == '\n':
+            if theme_start is not None and theme_call is None and len(stack) == theme_depth:
+                # No semicolon: the statement ends with its line
+                theme_call = (theme_start, i)
+            i += 1
+            line_start = i
+            continue
+        if c in ' \t\r':
+            i += 1
+            continue
+
+        if c == '/':
+            nxt = content[i + 1:i + 2]
+            if nxt == '/':
+                i = content.find('\n', i)
+                if i < 0:
+                    i = n
+                continue
+            if nxt == '*':
+                j = content.find('*/', i + 2)
+                i = n if j < 0 else j + 2
+                continue
+            if not prev or prev in REGEX_PREFIX:
+                i = _skip_regex(content, i)
+                prev = '/'
+                continue
+
+        if c in '\'"':
+            i = _skip_string(content, i, c)
+            prev = c
+            continue
+        if c == '`':
+            i = _skip_template(content, i)
+            prev = c
+            continue
+
+        if c in IDENT_START:
+            j = i + 1
+            while j < n and content[j] in IDENT_CHARS:
+                j += 1
+            word = content[i:j]
+            if word == 'useTenantTheme' and theme_start is None and CALL_OPEN.match(content, j):
+                theme_start = line_start
+                theme_depth = len(stack)
+                if stack:
+                    component_start = top_open
+            elif word == 'StyleSheet' and styles is None and styles_start is None and stack:
+                call = STYLES_CALL.match(content, j)
+                if call and STYLES_DECL.match(content, line_start, i):
+                    styles_start = max(line_start - 1, 0)
+                    body_start = call.end()
+                    stack.append((')', 'styles_call'))
+                    stack.append(('}', 'styles_body'))
+                    prev = '{'
+                    i = body_start
+                    continue
+            prev = word[-1]
+            i = j
+            continue
+
+        if c in CLOSERS:
+            if not stack:
+                top_open = line_start
+            stack.append((CLOSERS[c], None))
+        elif c in ')]}':
+            tag = stack.pop()[1] if stack else None
+            if tag == 'styles_body':
+                body_end = i
+            elif tag == 'styles_call':
+                semicolon = SEMICOLON.match(content, i + 1)
+                styles = (styles_start, semicolon.end() if semicolon else i + 1, body_start, body_end)
+            elif not stack and component_start is not None and component is None:
+                semicolon = SEMICOLON.match(content, i + 1)
+                component = (component_start, semicolon.end() if semicolon else i + 1)
+        elif c == ';':
+            if theme_start is not None and theme_call is None and len(stack) == theme_depth:
+                theme_call = (theme_start, i + 1)
+
+        prev = c
+        i += 1
+
+        if component is not None and styles is not None:
+            break
+
+    return SourceScan(component, theme_call, styles)
+
+
+def _iter_tokens(content, start, end):
+    """Yield the identifiers and punctuation characters of ``content[start:end]``.
+
+    Comments, strings and regex literals are skipped, as are template
+    literals apart from the tokens of their ${...} expressions.
+    """
+    i = start
+    prev = ''
+    while i < end:
+        c = content[i]
+        if c in ' \t\r\n':
+            i += 1
+            continue
+        if c == '/':
+            nxt = content[i + 1:i + 2]
+            if nxt == '/':
+                i = content.find('\n', i, end)
+                if i < 0:
+                    i = end
+                continue
+            if nxt == '*':
+                j = content.find('*/', i + 2, end)
+                i = end if j < 0 else j + 2
+                continue
+            if not prev or prev in REGEX_PREFIX:
+                i = _skip_regex(content, i)
+                prev = '/'
+                continue
+        if c in '\'"':
+            i = _skip_string(content, i, c)
+            prev = c
+            continue
+        if c == '`':
+            expressions = []
+            i = _skip_template(content, i, expressions)
+            for expr_start, expr_end in expressions:
+                yield from _iter_tokens(content, expr_start, min(expr_end, end))
+            prev = c
+            continue
+        if c in IDENT_START:
+            j = i + 1
+            while j < end and content[j] in IDENT_CHARS:
+                j += 1
+            yield content[i:j]
+            prev = content[j - 1]
+            i = j
+            continue
+        yield c
+        prev = c
+        i += 1
+
+
+def _style_references(content, body_start, body_end):
+    """Names a StyleSheet.create body reads: not property names or object keys."""
+    tokens = list(_iter_tokens(content, body_start, body_end))
+    names = set()
+    for k, token in enumerate(tokens):
+        if token[0] not in IDENT_START:
+            continue
+        before = tokens[k - 1] if k else '{'
+        after = tokens[k + 1] if k + 1 < len(tokens) else ''
+        # a.b is a property, but ...b spreads a variable
+        if before == '.' and (k < 2 or tokens[k - 2] != '.'):
+            continue
+        if before in '{,' and after == ':':
+            continue
+        names.add(token)
+    return names
+
+
+def _module_bindings(content):
+    """Names bound at the top level of a module: imports and declarations."""
+    names = set()
+    depth = 0
+    tokens = _iter_tokens(content, 0, len(content))
+    for token in tokens:
+        if token in '([{':
+            depth += 1
+        elif token in ')]}':
+            depth -= 1
+        elif depth:
+            continue
+        elif token == 'import':
+            # import X, { a, b as c, type T } from '...'; import * as X from '...'
+            last = None
+            for token in tokens:
+                if token in ('from', ';', '('):
+                    break
+                if token == 'as':
+                    names.discard(last)
+                elif token[0] in IDENT_START and token != 'type':
+                    names.add(token)
+                    last = token
+                    continue
+                last = None
+        elif token in DECLARATION_KEYWORDS:
+            token = next(tokens, '')
+            if token[0:1] in IDENT_START:
+                names.add(token)
+            elif token in ('{', '['):
+                # Destructuring: keep the bound names, not the renamed keys
+                nesting = 1
+                previous = None
+                for token in tokens:
+                    if token in '([{':
+                        nesting += 1
+                    elif token in ')]}':
+                        nesting -= 1
+                        if not nesting:
+                            break
+                    elif token == ':' and previous:
+                        names.discard(previous)
+                    if token[0] in IDENT_START:
+                        names.add(token)
+                        previous = token
+                    else:
+                        previous = None
+    return names
+
+
+def component_locals(content, styles):
+    """Names the styles body takes from its component (state, props, hooks).
+
+    Anything it reads besides `theme`, the module's own bindings and
+    STYLE_GLOBALS would be undefined once the body moves to a module-level
+    createStyles(theme), so such a component can't be converted.
+    """
+    body_start, body_end = styles[2:]
+    names = _style_references(content, body_start, body_end) - STYLE_GLOBALS - {'theme'}
+    if names:
+        names -= _module_bindings(content)
+    return sorted(names)
+
+
+def register_rule(name, anchors, unmatched=NO_CHANGES):
+    """Decorator adding a rewrite function to RULES.
+
+    Rules run in registration order; the first one's status is the file's
+    status unless a later rule rewrites the file.
+    """
+    def decorator(func):
+        global _prefilter
+        RULES.append(Rule(name, tuple(anchors), func, unmatched))
+        _prefilter = None
+        return func
+    return decorator
+
+
+def _get_prefilter():
+    """Compile every rule anchor into a single alternation, once."""
+    global _prefilter
+    if _prefilter is None:
+        anchors = sorted({anchor for rule in RULES for anchor in rule.anchors}, key=len, reverse=True)
+        # Zero-width lookahead so an anchor overlapping another is still seen
+        _prefilter = re.compile('(?=(' + '|'.join(map(re.escape, anchors)) + '))')
+    return _prefilter
+
+
+def matching_rules(content):
+    """Return the rules with at least one anchor in ``content``, from a single scan."""
+    hits = {match.group(1) for match in _get_prefilter().finditer(content)}
+    return [
+        rule for rule in RULES
+        if any(hit.startswith(anchor) for anchor in rule.anchors for hit in hits)
+    ]
+
+
+def rules_signature():
+    """Identify the active rule set, for invalidating cached outcomes."""
+    return [RULES_VERSION] + [rule.name for rule in RULES]
+
+
+def format_status(filepath, status, detail=None, dry_run=False):
+    """Render the report line for a single file outcome."""
+    messages = DRY_RUN_MESSAGES if dry_run else STATUS_MESSAGES
+    return messages[status].format(filepath, detail)
+
 
 def fix_styles_file(filepath):
     """Fix a single file by converting static StyleSheet to dynamic createStyles."""
+    status, detail = _fix_styles_file(filepath)
+    print(format_status(filepath, status, detail))
+    return status == FIXED
+
+
+def _fix_styles_file(filepath):
+    """Fix a single file and return a (status, detail) tuple instead of printing."""
+
+    _, content = _read_source(filepath)
+    new_content, status = transform_source(content)
+
+    # Only write if content changed
+    if status == FIXED:
+        batch = WriteBatch()
+        batch.stage(filepath, new_content)
+        batch.commit()
+    return status, None
+
+
+def _read_source(filepath):
+    """Return a file's raw bytes and its text with newlines normalised to '\\n'."""
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    return raw, _decode_source(raw)
+
+
+def _decode_source(raw):
+    """Decode source bytes, normalising CRLF and CR newlines to '\\n' as the rules expect."""
+    content = raw.decode('utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+class WriteBatch:
+    """Stage rewritten files next to their targets and swap them in together.
+
+    Nothing is written over a target until commit(), which fsyncs each
+    staged file, renames them into place and then fsyncs each affected
+    directory once, so a crash leaves either the old or the new file, never
+    a truncated one, and the renames themselves survive it.
+    """
+
+    def __init__(self):
+        self._staged = []
+
+    def stage(self, filepath, content):
+        directory = os.path.dirname(os.path.abspath(filepath))
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f'.{os.path.basename(filepath)}.', suffix='.tmp', dir=directory,
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content.encode('utf-8'))
+            shutil.copymode(filepath, tmp_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._staged.append((filepath, tmp_path))
+
+    def commit(self):
+        """Make every staged file durable, then rename them over their targets."""
+        staged, self._staged = self._staged, []
+        renamed = 0
+        try:
+            for _, tmp_path in staged:
+                with open(tmp_path, 'rb+') as f:
+                    os.fsync(f.fileno())
+            for filepath, tmp_path in staged:
+                os.replace(tmp_path, filepath)
+                renamed += 1
+        finally:
+            # Whatever wasn't renamed into place (a failed fsync or rename) is dropped
+            for _, tmp_path in staged[renamed:]:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+        for directory in sorted({os.path.dirname(tmp_path) for _, tmp_path in staged}):
+            _fsync_directory(directory)
+
+    def abort(self):
+        """Discard every staged file, leaving the targets untouched."""
+        staged, self._staged = self._staged, []
+        for _, tmp_path in staged:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def _fsync_directory(directory):
+    """Flush a directory's entries, e.g. after a rename into it (POSIX only)."""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def _stage(timings, name):
+    """Add the wall time of the block to ``timings[name]`` (no-op without timings)."""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+def transform_source(content, timings=None):
+    """Apply every registered rule to a component's source, in memory.
 
-    original_content = content
+    Returns ``(new_content, status)``; ``new_content`` is ``content`` itself
+    unless the status is FIXED. Does no I/O, so it can be called from
+    editor hooks and pipelines directly. The anchors of all rules are found
+    in one scan and rules without a hit are not run. Pass a dict as
+    ``timings`` to collect seconds spent per stage.
+    """
+    with _stage(timings, 'prefilter'):
+        matched = matching_rules(content)
+    status = None
+    for rule in RULES:
+        if rule in matched:
+            content, rule_status = rule.apply(content, timings=timings)
+        else:
+            rule_status = rule.unmatched
+        if status is None or rule_status == FIXED:
+            status = rule_status
+    return content, status
 
+
+@register_rule('theme-styles', ['useTenantTheme', 'const styles = createStyles('], unmatched=MISSING_THEME)
+def convert_theme_styles(content, timings=None):
+    """Convert a component's static StyleSheet to a createStyles(theme) factory."""
+    # First, check if styles call already exists
+    if 'const styles = createStyles(' in content:
+        return content, ALREADY_FIXED
+
+    # One pass over the file locates the useTenantTheme() call, the
+    # StyleSheet.create({...}) block and the end of the enclosing component
+    with _stage(timings, 'scan'):
+        scan = scan_source(content)
+
+    with _stage(timings, 'rewrite'):
+        return _rewrite_theme_styles(content, scan)
+
+
+def _rewrite_theme_styles(content, scan):
+    """Build the converted source from the spans found by scan_source."""
     # Pattern 1: Find useTenantTheme() call - we need to add styles call after this
     # Look for patterns like:
     # const theme = useTenantTheme();
     # const { theme } = useTenantTheme();
     # const { theme: tenantTheme } = useTenantTheme();
+    if scan.theme_call is None:
+        return content, MISSING_THEME
 
-    # First, check if styles call already exists
-    if 'const styles = createStyles(' in content:
-        print(f"✓ {filepath} - Already has createStyles call")
-        return False
-
-    # Find the component function and where to add styles call
-    # Pattern: Look for useTenantTheme() and add styles call after it
-    theme_patterns = [
-        (r'(const { theme } = useTenantTheme\(\);)', r'\1\n  const styles = createStyles(theme);'),
-        (r'(const theme = useTenantTheme\(\);)', r'\1\n  const styles = createStyles(theme.theme);'),
-        (r'(const { theme: tenantTheme } = useTenantTheme\(\);)', r'\1\n  const theme = tenantTheme;\n  const notify = useNotification();\n  const styles = createStyles(theme);'),
-    ]
+    stmt_start, stmt_end = scan.theme_call
+    statement = content[stmt_start:stmt_end]
+    indent = statement[:len(statement) - len(statement.lstrip())]
 
-    styles_added = False
-    for pattern, replacement in theme_patterns:
-        if re.search(pattern, content):
-            # Special handling for different patterns
-            if '{ theme: tenantTheme }' in pattern:
-                # Already has theme aliasing, add after notify
-                content = re.sub(
-                    r'(const { theme: tenantTheme } = useTenantTheme\(\);\n  const theme = tenantTheme;\n  const notify = useNotification\(\);)',
-                    r'\1\n  const styles = createStyles(theme);',
-                    content
-                )
-            elif '{ theme }' in pattern:
-                content = re.sub(pattern, replacement, content)
-            else:
-                content = re.sub(pattern, replacement, content)
-            styles_added = True
-            break
+    theme_match = THEME_STATEMENT.fullmatch(statement.strip())
+    if not theme_match:
+        return content, MISSING_THEME
 
-    if not styles_added:
-        print(f"✗ {filepath} - Could not find useTenantTheme() pattern")
-        return False
+    added_lines = THEME_INSERTS[theme_match.lastgroup]
+    insert_at = stmt_end
+    if theme_match.lastgroup == 'aliased':
+        # Already has theme aliasing, add after notify
+        alias_match = TENANT_ALIAS_PATTERN.match(content, stmt_end)
+        if alias_match:
+            insert_at = alias_match.end()
+            added_lines = added_lines[-1:]
+    theme_insert = ''.join(f'\n{indent}{line}' for line in added_lines)
 
     # Pattern 2: Find and extract the StyleSheet.create block
-    # Look for: const styles = StyleSheet.create({ ... });
-    # OR:       const styles = StyleSheet.create({ (inside component, before return)
-
-    # Find the styles definition
-    styles_match = re.search(
-        r'\n  const styles = StyleSheet\.create\(\{(.*?)\n  \}\);',
-        content,
-        re.DOTALL
-    )
+    # Look for: const styles = StyleSheet.create({ ... }); inside a function
+    if scan.styles is None:
+        return content, MISSING_STYLES
 
-    if not styles_match:
-        print(f"✗ {filepath} - Could not find StyleSheet.create block")
-        return False
+    block_start, block_end, body_start, body_end = scan.styles
+    styles_content = content[body_start:body_end].rstrip(' \t')
+    if styles_content.endswith('\n'):
+        styles_content = styles_content[:-1]
 
-    styles_content = styles_match.group(1)
-    full_styles_block = styles_match.group(0)
+    # Find the component closing: the bracket that returns to top level
+    # after the useTenantTheme() call, plus its trailing semicolon
+    if scan.component is None:
+        return content, MISSING_COMPONENT_END
 
-    # Remove the styles block from inside the component
-    content = content.replace(full_styles_block, '')
+    component_end = scan.component[1]
 
-    # Find the component closing (}; before export)
-    # Look for the pattern: closing brace of component function
-    component_end_match = re.search(r'\n\};(\n\n(?:const createStyles|export default))', content)
-
-    if not component_end_match:
-        print(f"✗ {filepath} - Could not find component end")
-        return False
+    # The body can only refer to `theme` once it leaves the component
+    if component_locals(content, scan.styles):
+        return content, USES_COMPONENT_LOCALS
 
     # Insert the createStyles function after the component
     create_styles_func = f'''
@@ -91,35 +710,769 @@ const createStyles = (theme: any) => StyleSheet.create({{
 {styles_content}
   }});'''
 
-    # Insert before the export or next const
-    content = content.replace(
-        component_end_match.group(0),
-        f'\n}};{create_styles_func}{component_end_match.group(1)}'
-    )
+    edits = sorted([
+        (insert_at, insert_at, theme_insert),
+        (block_start, block_end, ''),
+        (component_end, component_end, create_styles_func),
+    ])
+    pieces = []
+    last = 0
+    for edit_start, edit_end, text in edits:
+        if edit_start < last:
+            raise ValueError("useTenantTheme() call overlaps the StyleSheet.create block")
+        pieces.append(content[last:edit_start])
+        pieces.append(text)
+        last = edit_end
+    pieces.append(content[last:])
+    new_content = ''.join(pieces)
 
-    # Only write if content changed
-    if content != original_content:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"✓ {filepath} - Fixed successfully")
-        return True
+    if new_content == content:
+        return content, NO_CHANGES
+    return new_content, FIXED
+
+
+def _run_one(filepath, fingerprint=False, dry_run=False, timed=False):
+    """Pool worker: transform one file without writing it.
+
+    Returns a FileResult. The payload is the new content for a FIXED file,
+    or its unified diff with ``dry_run``. With ``fingerprint`` an unchanged
+    file's (size, mtime, hash) is returned for the result cache, and with
+    ``timed`` the seconds spent per stage. Exceptions become an ERROR outcome.
+    """
+    timings = {} if timed else None
+    size = None
+    try:
+        with _stage(timings, 'read'):
+            st = os.stat(filepath)
+            raw, content = _read_source(filepath)
+        size = len(raw)
+        new_content, status = transform_source(content, timings=timings)
+    except Exception as e:
+        return FileResult(filepath, ERROR, e, None, None, size, timings)
+
+    if status != FIXED:
+        digest = hashlib.sha256(raw).hexdigest() if fingerprint else None
+        fp = (size, st.st_mtime_ns, digest) if fingerprint else None
+        return FileResult(filepath, status, None, fp, None, size, timings)
+    if dry_run:
+        with _stage(timings, 'diff'):
+            diff = difflib.unified_diff(
+                content.splitlines(keepends=True), new_content.splitlines(keepends=True),
+                fromfile=f'a/{filepath}', tofile=f'b/{filepath}',
+            )
+            # Mark a missing final newline the way diff(1) does, so the output applies
+            payload = ''.join(
+                line if line.endswith('\n') else f'{line}\n\\ No newline at end of file\n'
+                for line in diff
+            )
+        return FileResult(filepath, status, None, None, payload, size, timings)
+    return FileResult(filepath, status, None, None, new_content, size, timings)
+
+
+def file_fingerprint(filepath):
+    """Return (size, mtime_ns, sha256) for a file."""
+    st = os.stat(filepath)
+    with open(filepath, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return st.st_size, st.st_mtime_ns, digest
+
+
+def load_cache(cache_path):
+    """Load the result cache (or usage index), starting empty if it is missing, corrupt or stale."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = None
+
+    if not isinstance(cache, dict) or cache.get('version') != rules_signature():
+        cache = {'version': rules_signature(), 'files': {}}
+    cache['seen'] = set()
+    return cache
+
+
+def fresh_entry(cache, filepath):
+    """Return the cache entry for a file if the file is unchanged, or None.
+
+    A matching size and mtime costs a single stat. If they differ but the
+    content hash still matches (e.g. after a checkout), the entry is
+    refreshed and reused without looking at the source again.
+    """
+    key = os.path.abspath(filepath)
+    entry = cache['files'].get(key)
+    if entry is None:
+        return None
+    cache['seen'].add(key)
+
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    if st.st_size == entry['size'] and st.st_mtime_ns == entry['mtime_ns']:
+        return entry
+    if st.st_size != entry['size']:
+        return None
+
+    size, mtime_ns, digest = file_fingerprint(filepath)
+    if digest != entry['sha256']:
+        return None
+    entry['mtime_ns'] = mtime_ns
+    return entry
+
+
+def cached_status(cache, filepath):
+    """Return the cached outcome for an unchanged file, or None."""
+    entry = fresh_entry(cache, filepath)
+    return None if entry is None else entry['status']
+
+
+def record_status(cache, filepath, status, fingerprint):
+    """Remember a file's outcome; a freshly fixed file is already fixed next time."""
+    key = os.path.abspath(filepath)
+    cache['seen'].add(key)
+    if status == FIXED:
+        status = ALREADY_FIXED
+    if status not in CACHEABLE or fingerprint is None:
+        cache['files'].pop(key, None)
+        return
+    size, mtime_ns, digest = fingerprint
+    cache['files'][key] = {'size': size, 'mtime_ns': mtime_ns, 'sha256': digest, 'status': status}
+
+
+def save_cache(cache, cache_path):
+    """Write the cache (or usage index) atomically, evicting entries for files that are gone."""
+    files = {
+        key: entry for key, entry in cache['files'].items()
+        if key in cache['seen'] or os.path.exists(key)
+    }
+    tmp_path = f'{cache_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': rules_signature(), 'files': files}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def _line_number(content, pos):
+    return content.count('\n', 0, pos) + 1
+
+
+def describe_source(content):
+    """Summarise a component's theme usage with the same scan as the codemod.
+
+    Returns a dict with the useTenantTheme() variant ('destructured',
+    'direct', 'aliased', 'other' or None) and statement, the line span of
+    the in-component ``const styles = StyleSheet.create`` block, the number
+    of StyleSheet.create calls, whether createStyles is already used, and
+    the status the codemod would report.
+    """
+    create_styles = 'const styles = createStyles(' in content
+    scan = scan_source(content)
+
+    theme_hook = theme_statement = theme_line = None
+    if scan.theme_call is not None:
+        stmt_start, stmt_end = scan.theme_call
+        theme_statement = content[stmt_start:stmt_end].strip()
+        theme_match = THEME_STATEMENT.fullmatch(theme_statement)
+        theme_hook = theme_match.lastgroup if theme_match else 'other'
+        theme_line = _line_number(content, stmt_start)
+
+    styles_lines = None
+    if scan.styles is not None:
+        block_start, block_end = scan.styles[:2]
+        styles_lines = [_line_number(content, block_start + 1), _line_number(content, block_end)]
+
+    if create_styles:
+        status = ALREADY_FIXED
     else:
-        print(f"- {filepath} - No changes needed")
-        return False
+        status = _rewrite_theme_styles(content, scan)[1]
+
+    return {
+        'theme_hook': theme_hook,
+        'theme_statement': theme_statement,
+        'theme_line': theme_line,
+        'styles_lines': styles_lines,
+        'stylesheet_blocks': content.count('StyleSheet.create('),
+        'create_styles': create_styles,
+        'status': status,
+    }
+
+
+def _describe_file(filepath):
+    """Pool worker: index one file; returns (filepath, entry, error)."""
+    try:
+        st = os.stat(filepath)
+        raw, content = _read_source(filepath)
+        entry = describe_source(content)
+    except Exception as e:
+        return filepath, None, e
+    entry.update(size=len(raw), mtime_ns=st.st_mtime_ns, sha256=hashlib.sha256(raw).hexdigest())
+    return filepath, entry, None
+
+
+def update_index(index, files, jobs=1):
+    """Bring the usage index up to date for ``files``; returns how many were rescanned.
+
+    Unchanged files are recognised with a stat (see fresh_entry) and keep
+    their entry; the rest are described again, in parallel with ``jobs``.
+    """
+    stale = [filepath for filepath in files if fresh_entry(index, filepath) is None]
+
+    if jobs > 1 and len(stale) > 1:
+        with Pool(processes=jobs) as pool:
+            results = pool.map(_describe_file, stale, chunksize=max(1, len(stale) // (jobs * 4)))
+    else:
+        results = map(_describe_file, stale)
+
+    for filepath, entry, error in results:
+        key = os.path.abspath(filepath)
+        index['seen'].add(key)
+        if entry is None:
+            print(format_status(filepath, ERROR, error), file=sys.stderr)
+            index['files'].pop(key, None)
+        else:
+            index['files'][key] = entry
+    return len(stale)
+
+
+def _parse_filter(text):
+    field, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected FIELD=VALUE, got {text!r}")
+    return field.strip(), value.strip()
+
+
+def query_index(index, filters=()):
+    """Return sorted (path, entry) pairs whose fields match every FIELD=VALUE filter.
+
+    Values compare case-insensitively as text, so ``create_styles=false``
+    and ``theme_hook=none`` work as expected.
+    """
+    def matches(entry):
+        return all(str(entry.get(field)).lower() == value.lower() for field, value in filters)
+
+    return sorted((path, entry) for path, entry in index['files'].items() if matches(entry))
+
+
+def print_index_summary(entries):
+    """Print how many indexed files use each hook variant and codemod status."""
+    for field in ('theme_hook', 'status'):
+        tally = {}
+        for _, entry in entries:
+            tally[str(entry[field])] = tally.get(str(entry[field]), 0) + 1
+        breakdown = ', '.join(f'{name}: {count}' for name, count in sorted(tally.items()))
+        print(f"{field}: {breakdown}")
+
+
+def _git(*args):
+    """Run a git command in the current repository and return its stdout."""
+    result = subprocess.run(['git', *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout
+
+
+def changed_files(ref, paths=(), extension='.tsx'):
+    """List files changed since the merge base of ``ref`` and HEAD.
+
+    Covers committed, staged and unstaged changes plus untracked files,
+    minus deletions, so the cost scales with the diff rather than the tree.
+    ``paths`` (files, directories or glob patterns) narrow the result.
+    Paths are returned relative to the current directory.
+    """
+    top = _git('rev-parse', '--show-toplevel').strip()
+    base = _git('merge-base', ref, 'HEAD').strip()
+    pattern = f'*{extension}'
+    names = _git('diff', '--name-only', '-z', '--diff-filter=ACMR', base, '--', pattern).split('\0')
+    names += _git('ls-files', '-z', '--others', '--exclude-standard', '--full-name', '--', pattern).split('\0')
+
+    roots = [os.path.abspath(path) for path in paths if not any(ch in path for ch in GLOB_CHARS)]
+    globs = [path for path in paths if any(ch in path for ch in GLOB_CHARS)]
+
+    files = []
+    for name in sorted(set(filter(None, names))):
+        path = os.path.join(top, name)
+        if not os.path.isfile(path):
+            continue
+        relpath = os.path.relpath(path)
+        if paths and not (
+            any(path == root or path.startswith(root + os.sep) for root in roots)
+            or any(fnmatch(relpath, pattern) for pattern in globs)
+        ):
+            continue
+        files.append(relpath)
+    return files
+
+
+def discover_files(paths, extension='.tsx'):
+    """Expand directories and glob patterns into a sorted, de-duplicated file list.
+
+    Explicit file paths are passed through untouched so the original
+    ``fix_theme_styles.py a.tsx b.tsx`` invocation keeps working.
+    """
+    files = []
+    seen = set()
+
+    def add(path):
+        if path not in seen:
+            seen.add(path)
+            files.append(path)
+
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d != 'node_modules' and not d.startswith('.'))
+                found.extend(os.path.join(root, name) for name in names if name.endswith(extension))
+            for found_path in sorted(found):
+                add(found_path)
+        elif any(ch in path for ch in GLOB_CHARS):
+            for found_path in sorted(glob.glob(path, recursive=True)):
+                if os.path.isfile(found_path):
+                    add(found_path)
+        else:
+            add(path)
+
+    return files
+
+
+def run(files, jobs=1, cache=None, dry_run=False, records=None, quiet=False):
+    """Fix every file, spreading the work over ``jobs`` processes.
+
+    Files whose outcome is in ``cache`` are not read at all. Results are
+    printed in input order and tallied per status, plus a ``cached`` count.
+    Rewritten files are staged and committed together at the end of the
+    run. With ``dry_run`` nothing is written: unified diffs go to stdout
+    and the report lines to stderr (as they do with ``quiet``).
+
+    If ``records`` is a list, a dict with each file's status, size and
+    per-stage timings is appended to it. The time spent committing the
+    batch is returned in the counts as ``commit_seconds``.
+    """
+    counts = dict.fromkeys(STATUS_MESSAGES, 0)
+    counts['cached'] = 0
+    out = sys.stderr if dry_run or quiet else sys.stdout
+    batch = WriteBatch()
+    staged = []
+
+    hits = {}
+    if cache is not None:
+        for filepath in files:
+            status = cached_status(cache, filepath)
+            if status is not None:
+                hits[filepath] = status
+    misses = [filepath for filepath in files if filepath not in hits]
+    worker = partial(_run_one, fingerprint=cache is not None, dry_run=dry_run, timed=records is not None)
+
+    def report(results):
+        for filepath in files:
+            if filepath in hits:
+                status, detail, timings = hits[filepath], None, {}
+                size = cache['files'][os.path.abspath(filepath)]['size']
+                counts['cached'] += 1
+            else:
+                result = next(results)
+                filepath, status, detail, size, timings = (
+                    result.filepath, result.status, result.detail, result.size, result.timings,
+                )
+                if status == FIXED and dry_run:
+                    sys.stdout.write(result.payload)
+                    sys.stdout.flush()
+                elif status == FIXED:
+                    try:
+                        with _stage(timings, 'write'):
+                            batch.stage(filepath, result.payload)
+                        staged.append(filepath)
+                    except OSError as e:
+                        status, detail = ERROR, e
+                elif cache is not None:
+                    record_status(cache, filepath, status, result.fingerprint)
+            print(format_status(filepath, status, detail, dry_run=dry_run), file=out)
+            counts[status] += 1
+            if records is not None:
+                records.append({
+                    'path': filepath,
+                    'status': status,
+                    'bytes': size,
+                    'cached': filepath in hits,
+                    'error': None if detail is None else str(detail),
+                    'timings': timings,
+                    'seconds': sum(timings.values()),
+                })
+
+    try:
+        if jobs > 1 and len(misses) > 1:
+            chunksize = max(1, len(misses) // (jobs * 4))
+            with Pool(processes=jobs) as pool:
+                report(pool.imap(worker, misses, chunksize=chunksize))
+        else:
+            report(map(worker, misses))
+    except BaseException:
+        batch.abort()
+        raise
+
+    commit_start = time.perf_counter()
+    batch.commit()
+    counts['commit_seconds'] = time.perf_counter() - commit_start
+    if cache is not None:
+        for filepath in staged:
+            record_status(cache, filepath, FIXED, file_fingerprint(filepath))
+
+    return counts
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _distribution(values):
+    values = sorted(values)
+    return {
+        'total': sum(values),
+        'mean': sum(values) / len(values) if values else 0.0,
+        'p50': _percentile(values, 50),
+        'p90': _percentile(values, 90),
+        'p99': _percentile(values, 99),
+        'max': values[-1] if values else 0.0,
+    }
+
+
+def build_report(records, counts, wall_seconds, jobs=1, dry_run=False):
+    """Assemble the --report json document: per-file records plus aggregates."""
+    processed = [record for record in records if not record['cached']]
+    return {
+        'rules': rules_signature(),
+        'jobs': jobs,
+        'dry_run': dry_run,
+        'files': records,
+        'summary': {
+            'files': len(records),
+            'bytes': sum(record['bytes'] or 0 for record in records),
+            'counts': {status: counts[status] for status in STATUS_MESSAGES},
+            'cached': counts['cached'],
+            'wall_seconds': wall_seconds,
+            'commit_seconds': counts['commit_seconds'],
+            'file_seconds': _distribution([record['seconds'] for record in processed]),
+            'stages': {
+                stage: _distribution([record['timings'].get(stage, 0.0) for record in processed])
+                for stage in STAGES
+            },
+        },
+    }
+
+
+def format_summary(counts, total, dry_run=False):
+    """Build the final summary line from per-status counts."""
+    missing = sum(counts[status] for status in PATTERN_MISSING)
+    return (
+        f"{'Would fix' if dry_run else 'Fixed'} {counts[FIXED]} out of {total} files "
+        f"({counts[ALREADY_FIXED]} already fixed, {missing} pattern missing, "
+        f"{counts[USES_COMPONENT_LOCALS]} using component state/props, "
+        f"{counts[ERROR]} errors, {counts['cached']} cached)"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert static StyleSheets to dynamic createStyles(theme) calls.",
+    )
+    parser.add_argument(
+        'paths', nargs='*',
+        help="Files, directories (searched recursively for .tsx) or glob patterns; "
+             "'-' reads a single source from stdin",
+    )
+    parser.add_argument(
+        '--stdin', action='store_true',
+        help="Read one component from stdin and write the result to stdout",
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=os.cpu_count() or 1,
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        '--cache', default=DEFAULT_CACHE_FILE, metavar='PATH',
+        help=f"Result cache file used to skip unchanged files (default: {DEFAULT_CACHE_FILE})",
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help="Process every file and leave the cache untouched",
+    )
+    parser.add_argument(
+        '--report', choices=('text', 'json'), default='text',
+        help="'json' prints per-file status, size and stage timings with aggregate "
+             "percentiles to stdout; report lines then go to stderr",
+    )
+    parser.add_argument(
+        '-n', '--dry-run', action='store_true',
+        help="Write nothing; print unified diffs to stdout and the report to stderr",
+    )
+    parser.add_argument(
+        '--index', action='store_true',
+        help="Update the theme-usage index for the given paths instead of rewriting "
+             "them, then list entries matching --where (no paths: query only)",
+    )
+    parser.add_argument(
+        '--index-file', default=DEFAULT_INDEX_FILE, metavar='PATH',
+        help=f"Theme-usage index location (default: {DEFAULT_INDEX_FILE})",
+    )
+    parser.add_argument(
+        '--where', action='append', type=_parse_filter, default=[], metavar='FIELD=VALUE',
+        help="Filter index entries, e.g. theme_hook=other or status=missing_styles (repeatable)",
+    )
+    parser.add_argument(
+        '--since', metavar='REF',
+        help="Only process .tsx files changed since the merge base with REF "
+             "(e.g. origin/main), limited to the given paths if any",
+    )
+    parser.add_argument(
+        '--watch', action='append', metavar='DIR', default=[],
+        help="Keep running and fix .tsx files under DIR as they change (repeatable)",
+    )
+    parser.add_argument(
+        '--debounce', type=float, default=0.2, metavar='SECONDS',
+        help="Quiet period that ends a burst of changes in --watch mode (default: 0.2)",
+    )
+    parser.add_argument(
+        '--poll-interval', type=float, default=1.0, metavar='SECONDS',
+        help="Rescan interval when inotify is unavailable (default: 1.0)",
+    )
+    args = parser.parse_args(argv)
+    if args.paths == ['-']:
+        args.stdin = True
+        args.paths = []
+    if not args.stdin and not args.paths and not args.watch and not args.since and not args.index:
+        parser.error("no input files given (use '-' or --stdin to read from stdin)")
+    if args.report == 'json' and args.dry_run:
+        parser.error("--report json and --dry-run both write to stdout")
+    return args
+
+
+def run_stdin():
+    """Stream one source from stdin to stdout; the status line goes to stderr."""
+    content = _decode_source(sys.stdin.buffer.read())
+    try:
+        new_content, status = transform_source(content)
+        detail = None
+    except Exception as e:
+        new_content, status, detail = content, ERROR, e
+    sys.stdout.buffer.write(new_content.encode('utf-8'))
+    sys.stdout.flush()
+    print(format_status('<stdin>', status, detail), file=sys.stderr)
+    return status != ERROR
+
+
+def _is_skipped_dir(name):
+    return name == 'node_modules' or name.startswith('.')
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class InotifyWatcher:
+    """Report changed files under some directories using Linux inotify (via ctypes)."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_ISDIR = 0x40000000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directories):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        for directory in directories:
+            self._add_tree(directory)
+
+    def _add_tree(self, directory):
+        for root, dirs, _ in os.walk(directory):
+            dirs[:] = [d for d in dirs if not _is_skipped_dir(d)]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), self.MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {root}")
+            self._dirs[wd] = root
+
+    def wait(self, timeout=None):
+        """Block up to ``timeout`` seconds and return the set of changed paths."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if not name or wd not in self._dirs:
+                continue
+            path = os.path.join(self._dirs[wd], os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and not _is_skipped_dir(os.path.basename(path)):
+                    self._add_tree(path)
+            else:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Report changed files by comparing size/mtime snapshots every ``interval`` seconds."""
+
+    def __init__(self, directories, interval=1.0):
+        self._directories = directories
+        self._interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        return {path: _stat_key(path) for path in discover_files(self._directories)}
+
+    def wait(self, timeout=None):
+        """Poll until something changes or ``timeout`` seconds pass; return changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._take_snapshot()
+            changed = {path for path, key in snapshot.items() if self._snapshot.get(path) != key}
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+                time.sleep(min(self._interval, remaining))
+            else:
+                time.sleep(self._interval)
+
+    def close(self):
+        pass
+
+
+def watch(directories, cache=None, cache_path=None, debounce=0.2, poll_interval=1.0, extension='.tsx'):
+    """Fix files under ``directories`` as they change, until interrupted.
+
+    Runs in-process so compiled patterns stay warm. Bursts of events are
+    merged until ``debounce`` seconds pass without a new one, and the
+    codemod's own writes are recognised and ignored.
+    """
+    try:
+        watcher = InotifyWatcher(directories)
+        mode = 'inotify'
+    except (OSError, AttributeError):
+        watcher = PollingWatcher(directories, interval=poll_interval)
+        mode = f'polling every {poll_interval}s'
+
+    # Size/mtime of each file as last processed, to skip our own writes
+    processed = {}
+    print(f"👀 Watching {', '.join(directories)} ({mode}) - press Ctrl+C to stop")
+
+    try:
+        while True:
+            changed = watcher.wait()
+            while True:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+
+            files = sorted(
+                path for path in changed
+                if path.endswith(extension) and os.path.isfile(path)
+                and _stat_key(path) != processed.get(path)
+            )
+            if not files:
+                continue
+
+            counts = run(files, cache=cache)
+            if cache is not None:
+                save_cache(cache, cache_path)
+            for path in files:
+                processed[path] = _stat_key(path)
+            print(f"{format_summary(counts, len(files))}\n")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        watcher.close()
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
-        print("Usage: python fix_theme_styles.py <filepath1> [filepath2] ...")
+        print("Usage: python fix_theme_styles.py [-j N] <file|dir|glob> [...]")
+        print("       python fix_theme_styles.py - < Component.tsx > Fixed.tsx")
+        print("       python fix_theme_styles.py --since <ref> [dir ...]")
+        print("       python fix_theme_styles.py --watch <dir>")
+        print("       python fix_theme_styles.py --index [dir ...] [--where FIELD=VALUE]")
         sys.exit(1)
 
-    files = sys.argv[1:]
-    fixed_count = 0
+    args = parse_args()
+    if args.stdin:
+        sys.exit(0 if run_stdin() else 1)
 
-    for filepath in files:
+    if args.watch:
+        cache = None if args.no_cache else load_cache(args.cache)
+        watch(args.watch, cache=cache, cache_path=args.cache,
+              debounce=args.debounce, poll_interval=args.poll_interval)
+        sys.exit(0)
+
+    started = time.perf_counter()
+    if args.index and not args.paths and not args.since:
+        # Query only: answer straight from the saved index
+        files = []
+    elif args.since:
         try:
-            if fix_styles_file(filepath):
-                fixed_count += 1
-        except Exception as e:
-            print(f"✗ {filepath} - Error: {e}")
+            files = changed_files(args.since, args.paths)
+        except (OSError, RuntimeError) as e:
+            print(f"✗ Could not list files changed since {args.since}: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        files = discover_files(args.paths)
+
+    if args.index:
+        index = load_cache(args.index_file)
+        if files:
+            rescanned = update_index(index, files, jobs=max(1, args.jobs))
+            save_cache(index, args.index_file)
+            print(f"Indexed {len(files)} files ({rescanned} rescanned)\n", file=sys.stderr)
+        entries = query_index(index, args.where)
+        if args.report == 'json':
+            json.dump({os.path.relpath(path): entry for path, entry in entries}, sys.stdout, indent=2)
+            print()
+            sys.exit(0)
+        for path, entry in entries:
+            location = entry['styles_lines'][0] if entry['styles_lines'] else entry['theme_line'] or 1
+            print(f"{os.path.relpath(path)}:{location} {entry['theme_hook']} {entry['status']}")
+        print()
+        print_index_summary(entries)
+        sys.exit(0)
+    cache = None if args.no_cache else load_cache(args.cache)
+    records = [] if args.report == 'json' else None
+    jobs = max(1, args.jobs)
+    counts = run(files, jobs=jobs, cache=cache, dry_run=args.dry_run, records=records, quiet=records is not None)
+    if cache is not None:
+        save_cache(cache, args.cache)
 
-    print(f"\nFixed {fixed_count} out of {len(files)} files")
+    print(f"\n{format_summary(counts, len(files), dry_run=args.dry_run)}",
+          file=sys.stderr if args.dry_run or records is not None else sys.stdout)
+    if records is not None:
+        report = build_report(records, counts, time.perf_counter() - started, jobs=jobs)
+        json.dump(report, sys.stdout, indent=2)
+        print()
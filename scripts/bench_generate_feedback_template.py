@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark for generate_feedback_template.py over synthetic feedback CSVs.
+
+Writes CSVs with the real templates' headers at increasing row counts, filling
+dropdown columns from Dropdown_Values_Reference.csv, numeric columns from
+their scale and free text from the templates' own sample values. Each case
+runs main() once in a fresh process and records the time spent in each
+stage (from the generator's --metrics json), peak RSS and output size. Cell
+formatting and the Priority Score formula are written while rows are
+imported, so they are part of "import".
+Results can be saved as a baseline and compared against later.
+
+Usage:
+    python bench_generate_feedback_template.py [--quick] [--rows N ...] [--modes MODE ...]
+                                               [--save-baseline FILE] [--compare FILE]
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import platform
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import generate_feedback_template as generator
+
+ROWS = (1000, 10000, 100000, 500000)
+QUICK_ROWS = (1000, 10000)
+MODES = ("default", "stream")
+
+# Generator stages (see generate_feedback_template.stage) shown as columns;
+# the rest are only counted in "other"
+STAGES = (
+    "hash", "load", "import", "column_widths", "validation", "conditional_formatting",
+    "priority_scores", "dashboard", "summary", "named_ranges", "save", "manifest",
+)
+
+# Feedback Log column index: Dropdown Reference category
+FEEDBACK_DROPDOWNS = {
+    generator.column_index_from_string(letter) - 1: category
+    for letter, category in generator.DROPDOWN_COLUMNS.items()
+}
+
+SCALE = re.compile(r"\((?:User )?(\d+)-(\d+)\)$")
+
+
+def read_templates():
+    """{sheet name: (header, sample rows)} from the real CSV templates"""
+    templates = {}
+    for sheet_name, csv_file in generator.CSV_FILES.items():
+        with open(generator.DOCS_DIR / csv_file, "r", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            templates[sheet_name] = (next(reader), list(reader))
+    return templates
+
+
+def dropdown_values(rows):
+    """{category: [values]} from the Dropdown Reference rows"""
+    values = {}
+    for row in rows:
+        values.setdefault(row[0], []).append(row[1])
+    return values
+
+
+def column_values(sheet_name, col_idx, name, samples, dropdown):
+    """Values to draw from for one column of a synthetic sheet"""
+    category = FEEDBACK_DROPDOWNS.get(col_idx) if sheet_name == "Feedback Log" else None
+    # Other sheets' columns named after a Dropdown Reference category use it too
+    category = category or (name if name in dropdown else None)
+    if category:
+        return dropdown[category]
+
+    scale = SCALE.search(name)
+    if scale:
+        return [str(value) for value in range(int(scale.group(1)), int(scale.group(2)) + 1)]
+    if name == "Votes":
+        return [str(value) for value in range(100)]
+    return [row[col_idx] for row in samples if col_idx < len(row)] or [""]
+
+
+def write_synthetic_csvs(docs_dir, rows, seed=0):
+    """Write every template CSV with ``rows`` data rows (the Dropdown Reference is copied as is)"""
+    rng = random.Random(seed)
+    templates = read_templates()
+    dropdown = dropdown_values(templates["Dropdown Reference"][1])
+
+    for sheet_name, csv_file in generator.CSV_FILES.items():
+        header, samples = templates[sheet_name]
+        with open(docs_dir / csv_file, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(header)
+            if sheet_name == "Dropdown Reference":
+                writer.writerows(samples)
+                continue
+
+            # IDs keep the template's prefix, e.g. FB-2025-000001
+            prefix = samples[0][0].rsplit("-", 1)[0] if samples else "ID"
+            columns = [column_values(sheet_name, col_idx, name, samples, dropdown)
+                       for col_idx, name in enumerate(header)]
+            for row_idx in range(1, rows + 1):
+                row = [rng.choice(values) for values in columns]
+                row[0] = f"{prefix}-{row_idx:06d}"
+                writer.writerow(row)
+
+
+def run_case(docs_dir, mode):
+    """Pool worker: run main() once over docs_dir; return (--metrics json output, peak bytes)"""
+    generator.DOCS_DIR = Path(docs_dir)
+    generator.OUTPUT_FILE = generator.DOCS_DIR / "bench.xlsx"
+
+    argv = ["--full", "--quiet", "--metrics", "json"] + (["--stream"] if mode == "stream" else [])
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        generator.main(argv)
+    # ru_maxrss is in bytes on macOS and in KB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return json.loads(output.getvalue()), peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_benchmarks(row_counts, modes):
+    results = []
+    for rows in row_counts:
+        with tempfile.TemporaryDirectory(prefix="feedback-bench-") as docs_dir:
+            write_synthetic_csvs(Path(docs_dir), rows)
+            for mode in modes:
+                # A process per case, so peak RSS isn't carried over from the previous one
+                with Pool(processes=1) as pool:
+                    metrics, peak = pool.apply(run_case, (docs_dir, mode))
+                stages = metrics["stages"]
+                results.append({
+                    "case": f"{mode}-r{rows}",
+                    "mode": mode,
+                    "rows": rows,
+                    "stages": stages,
+                    "other": metrics["seconds"] - sum(stage["seconds"] for stage in stages.values()),
+                    "seconds": metrics["seconds"],
+                    "peak_bytes": peak,
+                    "output_bytes": stages["save"]["bytes"],
+                })
+    return results
+
+
+def print_results(results, baseline=None):
+    previous = {row["case"]: row for row in baseline["results"]} if baseline else {}
+    stage_columns = "".join(f"{name:>{max(len(name), 7) + 2}}" for name in STAGES)
+    print(f"{'case':<16}{stage_columns}{'other':>8}{'total':>9}{'peak MB':>9}{'out KB':>10}{'vs base':>9}")
+    for row in results:
+        base = previous.get(row["case"])
+        ratio = f"{base['seconds'] / row['seconds']:.2f}x" if base else "-"
+        stages = "".join(
+            f"{row['stages'].get(name, {}).get('seconds', 0.0):>{max(len(name), 7) + 2}.2f}" for name in STAGES
+        )
+        print(
+            f"{row['case']:<16}{stages}{row['other']:>8.2f}{row['seconds']:>9.2f}"
+            f"{row['peak_bytes'] / 1024 / 1024:>9.1f}{row['output_bytes'] / 1024:>10.1f}{ratio:>9}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark generate_feedback_template.py stage by stage.")
+    parser.add_argument("--quick", action="store_true", help="Only run the smaller row counts")
+    parser.add_argument(
+        "--rows", type=int, nargs="+", metavar="N",
+        help=f"Feedback rows per sheet to benchmark (default: {' '.join(map(str, ROWS))})",
+    )
+    parser.add_argument(
+        "--modes", nargs="+", choices=MODES, default=list(MODES),
+        help="Generator modes to benchmark (default: both)",
+    )
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write the results to FILE as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Show speed-up relative to a saved baseline")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    row_counts = args.rows or (QUICK_ROWS if args.quick else ROWS)
+    results = run_benchmarks(row_counts, args.modes)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
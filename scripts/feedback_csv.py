@@ -0,0 +1,145 @@
+"""
+OrokiiPay User Feedback CSV Templates
+
+The CSV side of the feedback tracker, with no openpyxl dependency: where the
+templates live, how generate_feedback_template.py expects them to be laid
+out, and check_csvs(), which backs its fast --check mode.
+"""
+
+import csv
+import sys
+from pathlib import Path
+
+# Configuration
+SCRIPT_DIR = Path(__file__).parent
+DOCS_DIR = SCRIPT_DIR.parent / "docs"
+
+# CSV Template Files
+CSV_FILES = {
+    "Feedback Log": "OrokiiPay_User_Feedback_Template.csv",
+    "AI Assistant Feedback": "AI_Assistant_Feedback_Template.csv",
+    "Feature Requests": "Feature_Requests_Template.csv",
+    "Bug Reports": "Bug_Reports_Template.csv",
+    "Satisfaction Survey": "User_Satisfaction_Survey_Template.csv",
+    "Dropdown Reference": "Dropdown_Values_Reference.csv",
+}
+
+# Feedback Log columns with a dropdown, and the Dropdown Reference category it lists
+DROPDOWN_COLUMNS = {
+    "E": "User Type",
+    "H": "Platform",
+    "K": "Feature/Module",
+    "L": "Feedback Type",
+    "M": "Priority",
+    "N": "Severity",
+    "V": "AI Personality",
+    "Y": "Status",
+    "AA": "Assigned To",
+}
+
+# Feedback Log column holding the Priority Score formula (Z)
+PRIORITY_COLUMN = 26
+
+
+def column_index(letter):
+    """0-based index of a column letter, e.g. AA -> 26"""
+    index = 0
+    for char in letter:
+        index = index * 26 + ord(char) - ord("A") + 1
+    return index - 1
+
+
+def header_problems(sheet_name, header):
+    """(errors, warnings) about a CSV header row"""
+    if not header:
+        return ["no header row"], []
+
+    errors = []
+    warnings = []
+    names = [name.casefold() for name in header if name]
+    if len(names) < len(header):
+        warnings.append("blank column name(s) in the header")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        warnings.append(f"duplicate column name(s): {', '.join(duplicates)}")
+
+    # The generator's dropdowns, colour rules and Priority Score are placed by column
+    expected = {}
+    if sheet_name == "Feedback Log":
+        expected = {column_index(letter): category for letter, category in DROPDOWN_COLUMNS.items()}
+        expected[PRIORITY_COLUMN - 1] = "Priority Score"
+    elif sheet_name == "Dropdown Reference":
+        expected = {0: "Category", 1: "Values"}
+    for col_idx, name in sorted(expected.items()):
+        actual = header[col_idx] if col_idx < len(header) else ""
+        if not actual.startswith(name):
+            errors.append(f"column {col_idx + 1} should be '{name}', found '{actual}'")
+    return errors, warnings
+
+
+def check_csvs(docs_dir=DOCS_DIR):
+    """Stream each CSV template once and report header, row and dropdown problems
+
+    Rows with more values than the header and malformed headers are errors;
+    Feedback Log values missing from the Dropdown Reference are warnings,
+    as the workbook's dropdowns only stop new ones. Returns the error count.
+    """
+    print("🔍 Checking CSV templates...")
+    total_errors = 0
+    dropdown = {}
+
+    # The Dropdown Reference goes first, so the other sheets can be checked against it
+    sheet_names = ["Dropdown Reference"] + [name for name in CSV_FILES if name != "Dropdown Reference"]
+    for sheet_name in sheet_names:
+        csv_path = docs_dir / CSV_FILES[sheet_name]
+        if not csv_path.exists():
+            print(f"   ❌ {sheet_name}: missing {CSV_FILES[sheet_name]}")
+            total_errors += 1
+            continue
+
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            errors, warnings = header_problems(sheet_name, header)
+            allowed = {}
+            if sheet_name == "Feedback Log" and not errors:
+                allowed = {column_index(letter): dropdown.get(category, set())
+                           for letter, category in DROPDOWN_COLUMNS.items()}
+
+            rows = 0
+            # (column, value) -> [rows, first row]
+            invalid = {}
+            # Rows with values past the last header column: [rows, first row]
+            long_rows = [0, None]
+            for row_idx, row in enumerate(reader, start=2):
+                rows += 1
+                if len(row) > len(header) and any(row[len(header):]):
+                    long_rows[0] += 1
+                    long_rows[1] = long_rows[1] or row_idx
+                if sheet_name == "Dropdown Reference" and len(row) >= 2 and row[0] and row[1]:
+                    dropdown.setdefault(row[0], set()).add(row[1])
+                for col_idx, values in allowed.items():
+                    value = row[col_idx] if col_idx < len(row) else ""
+                    if value and value not in values:
+                        invalid.setdefault((col_idx, value), [0, row_idx])[0] += 1
+
+        if long_rows[0]:
+            errors.append(f"{long_rows[0]} row(s) with more values than the header, first at row {long_rows[1]}")
+        for (col_idx, value), (count, first_row) in invalid.items():
+            warnings.append(f"{header[col_idx]} '{value}' is not in the Dropdown Reference "
+                            f"({count} row(s), first at row {first_row})")
+
+        status = "❌" if errors else "⚠️ " if warnings else "✅"
+        print(f"   {status} {sheet_name}: {rows} rows, {len(header)} columns")
+        for problem in errors:
+            print(f"      ❌ {problem}")
+        for problem in warnings:
+            print(f"      ⚠️  {problem}")
+        total_errors += len(errors)
+
+    print()
+    if total_errors:
+        print(f"❌ {total_errors} problem(s) found in the CSV templates", file=sys.stderr)
+    else:
+        print("✅ CSV templates look good")
+    return total_errors
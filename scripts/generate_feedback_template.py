@@ -11,46 +11,87 @@ This script automatically generates a complete Excel workbook with:
 - Professional formatting
 
 Usage:
-    python generate_feedback_template.py
+    python generate_feedback_template.py [--stream] [--full] [-j JOBS] [-q]
+                                         [--profile FILE] [--metrics json]
+    python generate_feedback_template.py --check
+
+    --stream builds the workbook in write-only mode: rows are styled as they
+    are streamed from the CSVs, so no worksheet cells are held in memory;
+    only the sheets' per-row column arrays (see SheetData) grow with the
+    Feedback Log.
+
+    A manifest of CSV hashes is kept next to the output. Sheets whose CSV is
+    unchanged are copied over from the previous workbook, and nothing is
+    written at all when no CSV changed. --full ignores the manifest.
+
+    -j/--jobs builds the CSV sheets in parallel worker processes; the main
+    process adds the workbook-level parts and splices the sheets in.
+
+    -q/--quiet drops the progress output. --profile FILE saves cProfile stats
+    and --metrics json prints each stage's wall time, rows processed and
+    bytes written, for finding slow stages in scheduled runs.
+
+    --check streams each CSV once to check its header, row shapes and
+    dropdown values, without importing openpyxl or building the workbook;
+    it exits with status 1 if there are errors (for pre-commit and CI).
 
 Output:
     OrokiiPay_User_Feedback_Tracker.xlsx in the docs/ folder
 """
 
+import argparse
+import contextlib
+import cProfile
+import functools
+import hashlib
+import io
+import json
+import math
 import os
+import re
+import shutil
 import sys
-from pathlib import Path
-from datetime import datetime
+import tempfile
+import time
+import zipfile
+from array import array
+from collections import Counter
+from itertools import zip_longest
+from multiprocessing import Pool
+from datetime import date, datetime, timedelta
+from xml.etree import ElementTree
 import csv
 
+import feedback_csv
+from feedback_csv import CSV_FILES, DOCS_DIR, DROPDOWN_COLUMNS, PRIORITY_COLUMN, check_csvs
+
+# --check only reads the CSVs, so it is answered before openpyxl is imported
+if __name__ == "__main__" and "--check" in sys.argv[1:]:
+    sys.exit(1 if check_csvs() else 0)
+
 try:
-    from openpyxl import Workbook, load_workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+    from openpyxl.styles.differential import DifferentialStyle
+    from openpyxl.styles.fonts import DEFAULT_FONT
     from openpyxl.utils import get_column_letter
+    from openpyxl.utils.cell import column_index_from_string, coordinate_from_string, range_boundaries
     from openpyxl.worksheet.datavalidation import DataValidation
+    from openpyxl.worksheet.filters import AutoFilter
+    from openpyxl.worksheet.formula import ArrayFormula
+    from openpyxl.worksheet.table import Table, TableColumn, TableFormula
     from openpyxl.formatting.rule import CellIsRule
-    from openpyxl.chart import PieChart, BarChart, LineChart, Reference
+    from openpyxl.chart import BarChart, LineChart, Reference
 except ImportError:
     print("❌ Error: openpyxl is not installed.")
     print("📦 Install it with: pip install openpyxl")
     sys.exit(1)
 
 
-# Configuration
-SCRIPT_DIR = Path(__file__).parent
-DOCS_DIR = SCRIPT_DIR.parent / "docs"
+# Configuration (the CSV templates are listed in feedback_csv.CSV_FILES)
 OUTPUT_FILE = DOCS_DIR / "OrokiiPay_User_Feedback_Tracker.xlsx"
 
-# CSV Template Files
-CSV_FILES = {
-    "Feedback Log": "OrokiiPay_User_Feedback_Template.csv",
-    "AI Assistant Feedback": "AI_Assistant_Feedback_Template.csv",
-    "Feature Requests": "Feature_Requests_Template.csv",
-    "Bug Reports": "Bug_Reports_Template.csv",
-    "Satisfaction Survey": "User_Satisfaction_Survey_Template.csv",
-    "Dropdown Reference": "Dropdown_Values_Reference.csv",
-}
-
 # Color scheme (OrokiiPay branding)
 COLORS = {
     "primary": "010080",  # OrokiiPay dark blue
@@ -67,6 +108,241 @@ COLORS = {
     "alternate_row": "F5F5F5",
 }
 
+# Conditional formatting for the Feedback Log Priority (M) and Status (Y) columns
+PRIORITY_RULES = [
+    ("Critical", COLORS["critical"]),
+    ("High", COLORS["high"]),
+    ("Medium", COLORS["medium"]),
+    ("Low", COLORS["low"]),
+]
+STATUS_RULES = [
+    ("New", COLORS["new"]),
+    ("In Progress", COLORS["in_progress"]),
+    ("Resolved", COLORS["resolved"]),
+    ("Won't Fix", COLORS["wont_fix"]),
+]
+
+# Priority Score weights. They are written as lookup tables on the Dropdown
+# Reference sheet, right of its values (see weights_column) and no further
+# left than column WEIGHTS_COLUMN, so they can be tuned in the workbook;
+# values missing from a table get the default weight
+SEVERITY_WEIGHTS = [("Blocker", 4), ("Major", 3), ("Minor", 2), ("Cosmetic", 1)]
+USER_TYPE_WEIGHTS = [("VIP", 2), ("Beta Tester", 1.5), ("Early Adopter", 1), ("Regular User", 0.5), ("Internal Team", 0.5)]
+SEVERITY_DEFAULT = 1
+USER_TYPE_DEFAULT = 0.5
+SEVERITY_MULTIPLIER = 2.5
+WEIGHTS_COLUMN = 5
+
+# Priority Score (column Z of the Feedback Log), based on Severity (N) and User Type (E).
+# A calculated column of the Feedback Log table (PRIORITY_COLUMN), written once
+# in Z2 and shared by the rows below it; {table} is the table name
+PRIORITY_FORMULA = (
+    f"=IFERROR(VLOOKUP({{table}}[[#This Row],[Severity]],Severity_Weights,2,FALSE),{SEVERITY_DEFAULT})"
+    f"*{SEVERITY_MULTIPLIER}"
+    f"+IFERROR(VLOOKUP({{table}}[[#This Row],[User Type]],User_Type_Weights,2,FALSE),{USER_TYPE_DEFAULT})"
+)
+MAX_COLUMN_WIDTH = 50
+
+# Columns with a numeric scale in their header, e.g. "NPS Score (0-10)", hold
+# numbers; everything else is imported as text
+NUMERIC_HEADER = re.compile(r"\((?:User )?\d+-\d+\)$|^Votes$")
+NUMBER = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+# Columns with a fixed set of values (mostly the Dropdown Reference categories),
+# kept as interned labels in SheetData
+CATEGORICAL_HEADERS = {
+    "Category", "Values", "User Type", "Platform", "Feature/Module", "Feedback Type", "Priority",
+    "Severity", "AI Personality Used", "Status", "Assigned To", "User Satisfaction",
+}
+
+# Date columns, kept in SheetData as interned days (YYYY-MM-DD) for the weekly summary
+DATE_HEADERS = {"Submission Date"}
+
+# Columns linking sheets row by row, kept in SheetData as plain values
+KEY_HEADERS = {"Feedback ID"}
+
+# Sheet of summary tables and charts built from the SheetStore
+SUMMARY_SHEET = "📈 Summary"
+
+
+# Per stage: calls, wall time (seconds) and rows processed / bytes written,
+# filled in by the @stage functions below
+STAGE_METRICS = {}
+_stage_stack = []
+
+
+def stage(name, rows=None, bytes_written=None):
+    """Decorator recording a generator stage's calls and wall time in STAGE_METRICS[name]
+
+    rows and bytes_written, if given, map the function's result to the rows
+    it processed or bytes it wrote. Time spent in a stage called from inside
+    another counts towards the inner one only, so the stages add up.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            _stage_stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                inner = _stage_stack.pop()
+                if _stage_stack:
+                    _stage_stack[-1] += elapsed
+                metrics = STAGE_METRICS.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": 0, "bytes": 0})
+                metrics["calls"] += 1
+                metrics["seconds"] += elapsed - inner
+            if rows:
+                metrics["rows"] += rows(result)
+            if bytes_written:
+                metrics["bytes"] += bytes_written(result)
+            return result
+        return wrapper
+    return decorate
+
+
+def merge_stage_metrics(worker_metrics):
+    """Add STAGE_METRICS from a worker process to this process's"""
+    for name, worker in worker_metrics.items():
+        metrics = STAGE_METRICS.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": 0, "bytes": 0})
+        for key, value in worker.items():
+            metrics[key] += value
+
+
+def to_number(value):
+    """int or float for a numeric CSV value, anything else unchanged"""
+    if not NUMBER.match(value):
+        return value
+    return float(value) if "." in value else int(value)
+
+
+def solid_fill(color):
+    """Solid PatternFill in one of the COLORS"""
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+class SharedFormula(ArrayFormula):
+    """Cell value for a member of a shared formula group (<f t="shared">)
+
+    openpyxl writes an ArrayFormula's attributes and text as they are, so the
+    first cell carries the formula text and the ref of the whole group, and
+    every other cell just the group index; Excel fills in the rest.
+    """
+
+    t = "shared"
+
+    def __init__(self, ref=None, text=None, si=0):
+        super().__init__(ref, text)
+        self.si = si
+
+    def __iter__(self):
+        yield "t", self.t
+        if self.ref:
+            yield "ref", self.ref
+        yield "si", str(self.si)
+
+
+def weights_column(dropdown):
+    """First column of the weight tables: past the Dropdown Reference's widest row, after a gap column"""
+    return max(WEIGHTS_COLUMN, len(dropdown.widths) + 2)
+
+
+def weight_table_rows():
+    """Rows of the Priority Score lookup tables, header first: Severity | Weight | | User Type | Weight"""
+    rows = [["Severity", "Weight", None, "User Type", "Weight"]]
+    for severity, user_type in zip_longest(SEVERITY_WEIGHTS, USER_TYPE_WEIGHTS, fillvalue=(None, None)):
+        rows.append([*severity, None, *user_type])
+    return rows
+
+
+def table_name(sheet_name):
+    """Name of the Excel table holding a sheet's CSV data, e.g. FeedbackLog"""
+    return re.sub(r"\W", "", sheet_name)
+
+
+def table_column(sheet_name, header):
+    """Structured reference to a column of a sheet's table, e.g. FeedbackLog[Status]"""
+    # Brackets, # and ' in a column name are escaped with a '
+    escaped = re.sub(r"(['#\[\]])", r"'\1", header)
+    return f"{table_name(sheet_name)}[{escaped}]"
+
+
+def table_headers(sheet_name, values):
+    """Column names of a sheet's table from its CSV header row
+
+    Excel needs every table column named, and uniquely (ignoring case); the
+    Feedback Log table always reaches the Priority Score column.
+    """
+    count = max(len(values), PRIORITY_COLUMN) if sheet_name == "Feedback Log" else len(values)
+    names = []
+    seen = set()
+    for col_idx in range(count):
+        base = values[col_idx] if col_idx < len(values) and values[col_idx] else f"Column{col_idx + 1}"
+        name = base
+        suffix = 2
+        while name.casefold() in seen:
+            name = f"{base}{suffix}"
+            suffix += 1
+        seen.add(name.casefold())
+        names.append(name)
+    return names
+
+
+def add_sheet_table(ws, headers, ref):
+    """Add the Excel table over a sheet's CSV data; the Feedback Log's Priority Score is a calculated column
+
+    The headers must match the header row cells. Validation, conditional
+    formatting and dashboard formulas are scoped to the table, so Excel grows
+    them with it as rows are added.
+    """
+    name = table_name(ws.title)
+    columns = [TableColumn(id=col_idx, name=header) for col_idx, header in enumerate(headers, start=1)]
+    if ws.title == "Feedback Log":
+        formula = PRIORITY_FORMULA.format(table=name)[1:]
+        columns[PRIORITY_COLUMN - 1].calculatedColumnFormula = TableFormula(attr_text=formula)
+    # add_table insists on reading the headers back, which write-only sheets can't
+    ws.tables.add(Table(displayName=name, ref=ref, autoFilter=AutoFilter(ref=ref), tableColumns=columns))
+
+
+def table_data_rows(ws):
+    """(first, last) row of the data in a sheet's table"""
+    _, first_row, _, last_row = range_boundaries(ws.tables[table_name(ws.title)].ref)
+    return first_row + 1, last_row
+
+
+def build_named_styles():
+    """Every cell style the generator uses, built once from COLORS
+
+    Cells reference these by name, so each style is interned in styles.xml
+    once instead of being hashed and looked up per cell.
+    """
+    header = NamedStyle(
+        name="Header",
+        font=Font(name='Arial', size=11, bold=True, color=COLORS["header_text"]),
+        fill=solid_fill(COLORS["header_bg"]),
+        alignment=Alignment(horizontal='center', vertical='center', wrap_text=True),
+    )
+    metric_font = Font(size=12, bold=True, color=COLORS["primary"])
+
+    return [
+        header,
+        NamedStyle(name="Striped Row", font=DEFAULT_FONT, fill=solid_fill(COLORS["alternate_row"])),
+        NamedStyle(name="Priority Score", font=DEFAULT_FONT, number_format="0.0"),
+        NamedStyle(name="Striped Priority Score", font=DEFAULT_FONT, fill=solid_fill(COLORS["alternate_row"]), number_format="0.0"),
+        NamedStyle(name="Dashboard Title", font=Font(size=18, bold=True, color=COLORS["primary"])),
+        NamedStyle(name="Guide Title", font=Font(size=16, bold=True, color=COLORS["primary"])),
+        NamedStyle(name="Section Heading", font=Font(size=14, bold=True)),
+        NamedStyle(name="Subheading", font=Font(size=12, bold=True)),
+        NamedStyle(name="Label", font=Font(bold=True)),
+        NamedStyle(name="Metric Count", font=metric_font, number_format="#,##0"),
+        NamedStyle(name="Metric Average", font=metric_font, number_format="0.0"),
+        NamedStyle(name="Timestamp", font=Font(size=10, italic=True)),
+        NamedStyle(name="Body", font=Font(size=10)),
+        NamedStyle(name="Count", font=DEFAULT_FONT, number_format="#,##0"),
+        NamedStyle(name="Average", font=DEFAULT_FONT, number_format="0.0"),
+    ]
+
 
 def print_header():
     """Print script header"""
@@ -90,162 +366,343 @@ def check_csv_files():
             missing_files.append(csv_file)
 
     if missing_files:
-        print(f"\n❌ Error: {len(missing_files)} CSV file(s) missing!")
-        print("Please ensure all CSV templates are in the docs/ folder.")
+        print(f"\n❌ Error: {len(missing_files)} CSV file(s) missing!", file=sys.stderr)
+        print("Please ensure all CSV templates are in the docs/ folder.", file=sys.stderr)
         sys.exit(1)
 
     print("   ✅ All CSV files found!\n")
 
 
-def create_workbook():
+def create_workbook(write_only=False):
     """Create a new Excel workbook"""
     print("📝 Creating new Excel workbook...")
-    wb = Workbook()
+    wb = Workbook(write_only=write_only)
     # Remove default sheet
     if "Sheet" in wb.sheetnames:
         wb.remove(wb["Sheet"])
+    # Fix every cell-format and conditional-format id up front, so styles.xml
+    # doesn't depend on which sheets are written and sheet parts built in
+    # another workbook (a previous build or a worker) can be spliced in.
+    # openpyxl only assigns these ids as cells and rules are written, and has
+    # no public way to register them ahead of that, hence its private
+    # _cell_styles/_differential_styles; requirements-feedback.txt pins the
+    # openpyxl releases this was tested with.
+    for style in build_named_styles():
+        wb.add_named_style(style)
+        wb._cell_styles.add(style.as_tuple())
+    for _, color in PRIORITY_RULES + STATUS_RULES:
+        wb._differential_styles.add(DifferentialStyle(fill=solid_fill(color)))
     print("   ✅ Workbook created\n")
     return wb
 
 
-def import_csv_to_sheet(wb, sheet_name, csv_file):
-    """Import CSV data into a worksheet"""
+class SheetData:
+    """One CSV sheet held column by column, loaded once and shared by the generator stages
+
+    Numeric columns (with a NUMERIC_HEADER scale) are array('d'), NaN where a
+    value is blank or not a number. CATEGORICAL_HEADERS columns are arrays of
+    codes into interned labels, and so are DATE_HEADERS columns, by day.
+    KEY_HEADERS columns are kept as lists of values. Each of these holds an
+    entry per data row, so memory grows with the row count: about 8 bytes a
+    row per numeric column, 4 per coded column and a string per key. Other
+    free-text columns aren't kept at all; every column does keep its
+    non-empty count and longest value (header included, for the column
+    widths).
+    """
+
+    def __init__(self, header):
+        self.header = header
+        self.row_count = 0
+        self.widths = [len(value) for value in header]
+        self.filled = [0] * len(header)
+        self.numbers = {idx: array("d") for idx, name in enumerate(header) if NUMERIC_HEADER.search(name)}
+        self.codes = {idx: array("I") for idx, name in enumerate(header)
+                      if (name in CATEGORICAL_HEADERS or name in DATE_HEADERS) and idx not in self.numbers}
+        self.labels = {idx: [] for idx in self.codes}
+        self._label_codes = {idx: {} for idx in self.codes}
+        self._days = {idx for idx in self.codes if header[idx] in DATE_HEADERS}
+        self.keys = {idx: [] for idx, name in enumerate(header) if name in KEY_HEADERS}
+
+    def append(self, row):
+        """Add one data row"""
+        self.row_count += 1
+        if len(row) > len(self.widths):
+            self.widths.extend([0] * (len(row) - len(self.widths)))
+            self.filled.extend([0] * (len(row) - len(self.filled)))
+        for idx, value in enumerate(row):
+            if value:
+                self.filled[idx] += 1
+                if len(value) > self.widths[idx]:
+                    self.widths[idx] = len(value)
+
+        for idx, numbers in self.numbers.items():
+            value = row[idx] if idx < len(row) else ""
+            numbers.append(float(value) if NUMBER.match(value) else math.nan)
+        for idx, codes in self.codes.items():
+            value = row[idx] if idx < len(row) else ""
+            if idx in self._days:
+                value = value[:10]
+            label_codes = self._label_codes[idx]
+            code = label_codes.get(value)
+            if code is None:
+                code = label_codes[value] = len(self.labels[idx])
+                self.labels[idx].append(sys.intern(value))
+            codes.append(code)
+        for idx, keys in self.keys.items():
+            keys.append(row[idx].strip() if idx < len(row) else "")
+
+    def values(self, idx):
+        """Every row's label in a categorical column"""
+        return list(map(self.labels[idx].__getitem__, self.codes[idx]))
+
+    def value_counts(self, idx):
+        """Counter of a categorical column's non-empty values, case-folded as COUNTIF matches them"""
+        counts = Counter()
+        for code, count in Counter(self.codes[idx]).items():
+            label = self.labels[idx][code]
+            if label:
+                counts[label.casefold()] += count
+        return counts
+
+    def lookup(self, idx, mapping, default):
+        """array('d') of mapping[label] for every row of a categorical column
+
+        mapping is keyed by case-folded label, like VLOOKUP's exact match. It
+        is applied once per distinct label and then spread over the codes.
+        """
+        weights = [mapping.get(label.casefold(), default) for label in self.labels[idx]]
+        return array("d", map(weights.__getitem__, self.codes[idx]))
+
+    def mean(self, idx):
+        """Average of a numeric column's numbers (AVERAGE skips text and blanks), or None"""
+        numbers = [value for value in self.numbers[idx] if not math.isnan(value)]
+        return math.fsum(numbers) / len(numbers) if numbers else None
+
+    def crosstab(self, row_idx, col_idx):
+        """Counter of (row label, column label) pairs of two categorical columns, counted in one pass over their codes"""
+        row_labels, col_labels = self.labels[row_idx], self.labels[col_idx]
+        pairs = Counter(zip(self.codes[row_idx], self.codes[col_idx]))
+        return Counter({(row_labels[row], col_labels[col]): count for (row, col), count in pairs.items()})
+
+    def weekly_counts(self, idx):
+        """Counter of rows per week (keyed by its Monday) of a DATE_HEADERS column; unreadable days are skipped"""
+        weeks = Counter()
+        for code, count in Counter(self.codes[idx]).items():
+            try:
+                day = date.fromisoformat(self.labels[idx][code])
+            except ValueError:
+                continue
+            weeks[day - timedelta(days=day.weekday())] += count
+        return weeks
+
+
+@stage("load", rows=lambda data: data.row_count)
+def load_sheet_data(sheet_name):
+    """Load a sheet's CSV into SheetData in one pass"""
+    with open(DOCS_DIR / CSV_FILES[sheet_name], 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        data = SheetData(next(reader, []))
+        for row in reader:
+            data.append(row)
+    return data
+
+
+class SheetStore(dict):
+    """SheetData per sheet name, loaded from CSV_FILES on first use"""
+
+    def __missing__(self, sheet_name):
+        data = self[sheet_name] = load_sheet_data(sheet_name)
+        return data
+
+
+@stage("column_widths")
+def set_column_widths(ws, widths, max_width=MAX_COLUMN_WIDTH):
+    """Auto-fit column widths from the longest value in each column"""
+    for col_idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(width + 2, max_width)
+
+
+@stage("import", rows=lambda ws: table_data_rows(ws)[1] - 1)
+def import_csv_to_sheet(wb, sheet_name, csv_file, data):
+    """Import a CSV into a worksheet, formatting each cell as it is written
+
+    Header styling, row striping, column widths and (on the Feedback Log) the
+    priority score formula are all handled while the rows are ingested, so
+    every cell is touched once. The sheet's SheetData supplies the header,
+    row count and column widths up front (write-only sheets emit their
+    widths before the first row), so the CSV is only streamed for the values.
+    The data ends up in an Excel table sized to the CSV (see add_sheet_table).
+    The Dropdown Reference sheet also gets the Priority Score weight tables
+    next to its values.
+    """
     print(f"📊 Importing {sheet_name}...")
 
     csv_path = DOCS_DIR / csv_file
     ws = wb.create_sheet(title=sheet_name)
-
-    # Read CSV and write to sheet
+    priority = sheet_name == "Feedback Log"
+    weight_rows = weight_table_rows() if sheet_name == "Dropdown Reference" else []
+    weight_widths = [max(len(str(value or "")) for value in column) for column in zip(*weight_rows)]
+    weights_first = weights_column(data)
+    headers = table_headers(sheet_name, data.header)
+    row_count = data.row_count + 1
+    # Z2 holds the formula for the whole column; its ref is the full range of data rows
+    shared_formula = SharedFormula(f"Z2:Z{row_count}", PRIORITY_FORMULA.format(table=table_name(sheet_name)))
+
+    # Sheet views and column widths are written ahead of the rows in write-only mode
+    freeze_header_row(ws)
+    set_column_widths(ws, with_weight_widths(data.widths, weight_widths, weights_first))
+
+    def weights(row_idx):
+        """Weight table cells to go after the CSV values of a row"""
+        if row_idx > len(weight_rows):
+            return []
+        cells = []
+        for value in weight_rows[row_idx - 1]:
+            cell = WriteOnlyCell(ws, value=value)
+            if row_idx == 1 and value is not None:
+                cell.style = "Header"
+            cells.append(cell)
+        return [None] * (weights_first - 1) + cells
+
+    def extend(row, extra):
+        """Place extra cells from column 1 of row on, past the row's own values"""
+        if not extra:
+            return row
+        return list(row) + extra[len(row):]
+
+    # WriteOnlyCell builds a detached cell; both sheet types accept those in append()
     with open(csv_path, 'r', encoding='utf-8') as f:
-        csv_reader = csv.reader(f)
-        for row_idx, row in enumerate(csv_reader, start=1):
-            for col_idx, value in enumerate(row, start=1):
-                ws.cell(row=row_idx, column=col_idx, value=value)
-
-    print(f"   ✅ {sheet_name} imported ({ws.max_row} rows, {ws.max_column} columns)")
+        for row_idx, values in enumerate(csv.reader(f), start=1):
+            if row_idx == 1:
+                row = []
+                for value in headers:
+                    cell = WriteOnlyCell(ws, value=value)
+                    cell.style = "Header"
+                    row.append(cell)
+                ws.append(extend(row, weights(row_idx)))
+                continue
+
+            for col_idx in data.numbers:
+                if col_idx < len(values):
+                    values[col_idx] = to_number(values[col_idx])
+            if priority:
+                values += [None] * (PRIORITY_COLUMN - len(values))
+                values[PRIORITY_COLUMN - 1] = shared_formula if row_idx == 2 else SharedFormula()
+
+            if row_idx % 2 == 0:  # Even rows
+                row = []
+                for col_idx in range(max(len(headers), len(values))):
+                    cell = WriteOnlyCell(ws, value=values[col_idx] if col_idx < len(values) else None)
+                    cell.style = "Striped Row"
+                    row.append(cell)
+                if priority:
+                    row[PRIORITY_COLUMN - 1].style = "Striped Priority Score"
+            else:
+                row = values
+                if priority:
+                    row[PRIORITY_COLUMN - 1] = WriteOnlyCell(ws, value=values[PRIORITY_COLUMN - 1])
+                    row[PRIORITY_COLUMN - 1].style = "Priority Score"
+            ws.append(extend(row, weights(row_idx)))
+
+    # Weight tables longer than the CSV
+    for row_idx in range(row_count + 1, len(weight_rows) + 1):
+        ws.append(weights(row_idx))
+
+    columns = max(len(headers), len(data.widths))
+    # A table needs a data row, even if it's empty
+    table_ref = f"A1:{get_column_letter(len(headers))}{max(row_count, 2)}"
+    add_sheet_table(ws, headers, table_ref)
+
+    print(f"   ✅ {sheet_name} imported ({row_count} rows, {columns} columns)")
+    print(f"   ✅ Table {table_name(sheet_name)} covers {table_ref}")
+    if priority:
+        print(f"   ✅ Priority score formula shared down column Z (rows 2-{row_count})")
+    if weight_rows:
+        print(f"   ✅ Priority score weights added from column {get_column_letter(weights_first)}")
     return ws
 
 
-def format_header_row(ws):
-    """Apply formatting to header row"""
-    header_font = Font(name='Arial', size=11, bold=True, color=COLORS["header_text"])
-    header_fill = PatternFill(start_color=COLORS["header_bg"], end_color=COLORS["header_bg"], fill_type="solid")
-    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-
+def with_weight_widths(widths, weight_widths, first):
+    """Column widths with the weight tables' columns added from column first on"""
+    if not weight_widths:
+        return widths
+    widths = widths + [0] * (first - 1 - len(widths))
+    return widths[:first - 1] + weight_widths
 
-def apply_alternate_row_colors(ws):
-    """Apply alternate row coloring"""
-    alternate_fill = PatternFill(start_color=COLORS["alternate_row"], end_color=COLORS["alternate_row"], fill_type="solid")
 
-    for row_idx in range(2, ws.max_row + 1):
-        if row_idx % 2 == 0:  # Even rows
-            for col_idx in range(1, ws.max_column + 1):
-                ws.cell(row=row_idx, column=col_idx).fill = alternate_fill
+def freeze_header_row(ws):
+    """Freeze the top row"""
+    ws.freeze_panes = "A2"
 
 
-def auto_fit_columns(ws, max_width=50):
-    """Auto-fit column widths"""
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
+def named_range(category, suffix="List"):
+    """Name of a Dropdown Reference range, e.g. Feature_Module_List"""
+    return f"{category.replace(' ', '_').replace('/', '_')}_{suffix}"
 
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
 
-        adjusted_width = min(max_length + 2, max_width)
-        ws.column_dimensions[column_letter].width = adjusted_width
+def _add_named_range(wb, category, start_row, end_row, suffix="List", columns=("B", "B")):
+    """Define {Category}_List over a block of values in the Dropdown Reference sheet"""
+    from openpyxl.workbook.defined_name import DefinedName
 
+    range_name = named_range(category, suffix)
+    range_ref = f"'Dropdown Reference'!${columns[0]}${start_row}:${columns[1]}${end_row}"
 
-def freeze_header_row(ws):
-    """Freeze the top row"""
-    ws.freeze_panes = "A2"
-
+    try:
+        # Use new method for creating named ranges (openpyxl 3.1+)
+        defn = DefinedName(range_name, attr_text=range_ref)
+        wb.defined_names[range_name] = defn
+        print(f"   ✅ Created: {range_name}")
+    except Exception as e:
+        print(f"   ⚠️  Could not create {range_name}: {e}")
 
-def add_filters(ws):
-    """Add auto-filter to header row"""
-    ws.auto_filter.ref = ws.dimensions
 
+@stage("named_ranges")
+def create_named_ranges(wb, dropdown):
+    """Create named ranges for dropdown lists
 
-def create_named_ranges(wb):
-    """Create named ranges for dropdown lists"""
+    The categories come from column A of the Dropdown Reference SheetData
+    (write-only sheets can't be read back).
+    """
     print("📋 Creating named ranges for dropdowns...")
-
-    from openpyxl.workbook.defined_name import DefinedName
-
-    dropdown_sheet = wb["Dropdown Reference"]
+    categories = dropdown.values(0) if 0 in dropdown.codes else []
 
     # Define named ranges based on categories in Dropdown Reference sheet
     current_category = None
     start_row = None
 
-    for row_idx in range(2, dropdown_sheet.max_row + 1):
-        category = dropdown_sheet.cell(row=row_idx, column=1).value
-
+    for row_idx, category in enumerate(categories, start=2):
         if category and category != current_category:
             # Save previous range
             if current_category and start_row:
-                end_row = row_idx - 1
-                range_name = f"{current_category.replace(' ', '_').replace('/', '_')}_List"
-                range_ref = f"'Dropdown Reference'!$B${start_row}:$B${end_row}"
-
-                try:
-                    # Use new method for creating named ranges (openpyxl 3.1+)
-                    defn = DefinedName(range_name, attr_text=range_ref)
-                    wb.defined_names[range_name] = defn
-                    print(f"   ✅ Created: {range_name}")
-                except Exception as e:
-                    print(f"   ⚠️  Could not create {range_name}: {e}")
+                _add_named_range(wb, current_category, start_row, row_idx - 1)
 
             current_category = category
             start_row = row_idx
 
     # Save last range
     if current_category and start_row:
-        end_row = dropdown_sheet.max_row
-        range_name = f"{current_category.replace(' ', '_').replace('/', '_')}_List"
-        range_ref = f"'Dropdown Reference'!$B${start_row}:$B${end_row}"
+        _add_named_range(wb, current_category, start_row, len(categories) + 1)
 
-        try:
-            # Use new method for creating named ranges (openpyxl 3.1+)
-            defn = DefinedName(range_name, attr_text=range_ref)
-            wb.defined_names[range_name] = defn
-            print(f"   ✅ Created: {range_name}")
-        except Exception as e:
-            print(f"   ⚠️  Could not create {range_name}: {e}")
+    # Priority Score weight tables, written next to the values by import_csv_to_sheet
+    for offset, (category, weights) in enumerate((("Severity", SEVERITY_WEIGHTS), ("User Type", USER_TYPE_WEIGHTS))):
+        first = weights_column(dropdown) + 3 * offset
+        columns = (get_column_letter(first), get_column_letter(first + 1))
+        _add_named_range(wb, category, 2, len(weights) + 1, "Weights", columns)
 
     print()
 
 
+@stage("validation")
 def add_data_validation(ws, sheet_name):
     """Add data validation (dropdowns) to appropriate columns"""
     if sheet_name != "Feedback Log":
         return
 
     print("✅ Adding data validation to Feedback Log...")
+    first_row, last_row = table_data_rows(ws)
 
-    # Column mappings (column letter: named range)
-    validations = {
-        "E": "User_Type_List",
-        "H": "Platform_List",
-        "K": "Feature_Module_List",
-        "L": "Feedback_Type_List",
-        "M": "Priority_List",
-        "N": "Severity_List",
-        "V": "AI_Personality_List",
-        "Y": "Status_List",
-        "AA": "Assigned_To_List",
-    }
-
-    for col_letter, range_name in validations.items():
+    for col_letter, category in DROPDOWN_COLUMNS.items():
+        range_name = named_range(category)
         try:
             dv = DataValidation(type="list", formula1=f"={range_name}", allow_blank=True)
             dv.error = "Invalid value"
@@ -253,9 +710,9 @@ def add_data_validation(ws, sheet_name):
             dv.prompt = f"Please select from the dropdown list"
             dv.promptTitle = "Select Value"
 
-            # Apply to entire column (rows 2-1000)
-            ws.add_data_validation(dv)
-            dv.add(f"{col_letter}2:{col_letter}1000")
+            # Apply to the column's rows in the table; Excel extends it as the table grows
+            ws.data_validations.append(dv)
+            dv.add(f"{col_letter}{first_row}:{col_letter}{last_row}")
             print(f"   ✅ Added validation to column {col_letter} ({range_name})")
         except Exception as e:
             print(f"   ⚠️  Could not add validation to column {col_letter}: {e}")
@@ -263,143 +720,350 @@ def add_data_validation(ws, sheet_name):
     print()
 
 
-def add_priority_formula(ws, sheet_name):
-    """Add priority score formula to Feedback Log"""
-    if sheet_name != "Feedback Log":
-        return
-
-    print("🔢 Adding priority score formula...")
-
-    # Priority Score column is Z (column 26)
-    # Formula based on: Severity (N) and User Type (E)
-    formula = """=IF(N2="Blocker",4,IF(N2="Major",3,IF(N2="Minor",2,1)))*2.5+IF(E2="VIP",2,IF(E2="Beta Tester",1.5,IF(E2="Early Adopter",1,0.5)))"""
-
-    for row_idx in range(2, ws.max_row + 1):
-        ws[f"Z{row_idx}"] = formula
-        ws[f"Z{row_idx}"].number_format = "0.0"
-
-    print(f"   ✅ Formula added to column Z (rows 2-{ws.max_row})\n")
-
-
+@stage("conditional_formatting")
 def add_conditional_formatting(ws, sheet_name):
     """Add conditional formatting for Priority and Status columns"""
     if sheet_name != "Feedback Log":
         return
 
     print("🎨 Adding conditional formatting...")
+    first_row, last_row = table_data_rows(ws)
 
     # Priority column (M) - Color coding
-    priority_rules = [
-        ("Critical", COLORS["critical"]),
-        ("High", COLORS["high"]),
-        ("Medium", COLORS["medium"]),
-        ("Low", COLORS["low"]),
-    ]
-
-    for priority, color in priority_rules:
-        fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-        rule = CellIsRule(operator='equal', formula=[f'"{priority}"'], fill=fill)
-        ws.conditional_formatting.add(f"M2:M1000", rule)
+    for priority, color in PRIORITY_RULES:
+        rule = CellIsRule(operator='equal', formula=[f'"{priority}"'], fill=solid_fill(color))
+        ws.conditional_formatting.add(f"M{first_row}:M{last_row}", rule)
         print(f"   ✅ Priority: {priority} → {color}")
 
     # Status column (Y) - Color coding
-    status_rules = [
-        ("New", COLORS["new"]),
-        ("In Progress", COLORS["in_progress"]),
-        ("Resolved", COLORS["resolved"]),
-        ("Won't Fix", COLORS["wont_fix"]),
-    ]
-
-    for status, color in status_rules:
-        fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-        rule = CellIsRule(operator='equal', formula=[f'"{status}"'], fill=fill)
-        ws.conditional_formatting.add(f"Y2:Y1000", rule)
+    for status, color in STATUS_RULES:
+        rule = CellIsRule(operator='equal', formula=[f'"{status}"'], fill=solid_fill(color))
+        ws.conditional_formatting.add(f"Y{first_row}:Y{last_row}", rule)
         print(f"   ✅ Status: {status} → {color}")
 
     print()
 
 
-def create_dashboard_sheet(wb):
-    """Create analytics dashboard with summary metrics"""
+def write_cells(ws, cells):
+    """Write (coordinate, value, style name) entries to a sheet
+
+    Write-only sheets can only be appended to, so there the entries are
+    grouped into rows and emitted top to bottom.
+    """
+    if not ws.parent.write_only:
+        for coordinate, value, style in cells:
+            ws[coordinate] = value
+            if style:
+                ws[coordinate].style = style
+        return
+
+    rows = {}
+    for coordinate, value, style in cells:
+        column_letter, row_idx = coordinate_from_string(coordinate)
+        rows.setdefault(row_idx, {})[column_index_from_string(column_letter)] = (value, style)
+
+    for row_idx in range(1, max(rows) + 1):
+        columns = rows.get(row_idx, {})
+        row = []
+        for col_idx in range(1, max(columns, default=0) + 1):
+            if col_idx not in columns:
+                row.append(None)
+                continue
+            value, style = columns[col_idx]
+            cell = WriteOnlyCell(ws, value=value)
+            if style:
+                cell.style = style
+            row.append(cell)
+        ws.append(row)
+
+
+def merge_cells(ws, cell_range):
+    """Merge a range on a regular or write-only sheet"""
+    if ws.parent.write_only:
+        ws.merged_cells.add(cell_range)
+    else:
+        ws.merge_cells(cell_range)
+
+
+@stage("priority_scores", rows=len)
+def priority_scores(data):
+    """Priority Score of every Feedback Log data row, as the column Z formula computes it
+
+    Severity and User Type are looked up once per distinct label (see
+    SheetData.lookup), then combined row by row.
+    """
+    severity = data.lookup(column_index_from_string("N") - 1,
+                           {label.casefold(): weight for label, weight in SEVERITY_WEIGHTS}, SEVERITY_DEFAULT)
+    user_type = data.lookup(column_index_from_string("E") - 1,
+                            {label.casefold(): weight for label, weight in USER_TYPE_WEIGHTS}, USER_TYPE_DEFAULT)
+    return array("d", (points * SEVERITY_MULTIPLIER + weight for points, weight in zip(severity, user_type)))
+
+
+def dashboard_metric(sheet_name, column, aggregate, criteria, data):
+    """Formula for a dashboard metric over a table column, plus its value computed from the sheet's SheetData
+
+    Errors are returned as their Excel error string, e.g. "#DIV/0!".
+    """
+    idx = column_index_from_string(column) - 1
+    ref = table_column(sheet_name, table_headers(sheet_name, data.header)[idx])
+    if aggregate == "count":
+        return f"=COUNTA({ref})", data.filled[idx]
+    if aggregate == "average":
+        value = data.mean(idx)
+        return f"=AVERAGE({ref})", "#DIV/0!" if value is None else value
+    counts = data.value_counts(idx)
+    formula = "=" + "+".join(f'COUNTIF({ref},"{value}")' for value in criteria)
+    return formula, sum(counts[value.casefold()] for value in criteria)
+
+
+@stage("dashboard")
+def create_dashboard_sheet(wb, store):
+    """Create analytics dashboard with summary metrics
+
+    Metrics are computed from the SheetStore while generating and returned as
+    {column: (first row, values)}, so save_workbook can store them as the
+    formulas' cached results.
+    """
     print("📊 Creating Dashboard sheet...")
 
     ws = wb.create_sheet("Dashboard", 0)  # Insert as first sheet
 
+    # Format columns
+    ws.column_dimensions["A"].width = 30
+    ws.column_dimensions["B"].width = 15
+    ws.column_dimensions["D"].width = 25
+    ws.column_dimensions["E"].width = 15
+
     # Title
-    ws["A1"] = "📊 OrokiiPay User Feedback Dashboard"
-    ws["A1"].font = Font(size=18, bold=True, color=COLORS["primary"])
-    ws.merge_cells("A1:F1")
+    cells = [("A1", "📊 OrokiiPay User Feedback Dashboard", "Dashboard Title")]
+    merge_cells(ws, "A1:F1")
 
     # Last Updated
-    ws["A2"] = f"Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-    ws["A2"].font = Font(size=10, italic=True)
+    cells.append(("A2", f"Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", "Timestamp"))
 
     # Summary Metrics Section
-    ws["A4"] = "📈 Summary Metrics"
-    ws["A4"].font = Font(size=14, bold=True)
+    cells.append(("A4", "📈 Summary Metrics", "Section Heading"))
 
-    # Metric labels
+    # Metric labels: (label, sheet, column, aggregate, COUNTIF criteria)
     metrics = [
-        ("Total Feedback Count", "=COUNTA('Feedback Log'!A:A)-1"),
-        ("Open Items", "=COUNTIFS('Feedback Log'!Y:Y,\"New\")+COUNTIFS('Feedback Log'!Y:Y,\"Under Review\")+COUNTIFS('Feedback Log'!Y:Y,\"In Progress\")"),
-        ("Resolved Items", "=COUNTIF('Feedback Log'!Y:Y,\"Resolved\")"),
-        ("Critical/High Priority", "=COUNTIFS('Feedback Log'!M:M,\"Critical\")+COUNTIFS('Feedback Log'!M:M,\"High\")"),
-        ("AI-Related Feedback", "=COUNTIF('Feedback Log'!K:K,\"AI Assistant\")"),
-        ("Bug Reports", "=COUNTIF('Feedback Log'!L:L,\"Bug\")"),
-        ("Feature Requests", "=COUNTIF('Feedback Log'!L:L,\"Feature Request\")"),
+        ("Total Feedback Count", "Feedback Log", "A", "count", None),
+        ("Open Items", "Feedback Log", "Y", "countif", ["New", "Under Review", "In Progress"]),
+        ("Resolved Items", "Feedback Log", "Y", "countif", ["Resolved"]),
+        ("Critical/High Priority", "Feedback Log", "M", "countif", ["Critical", "High"]),
+        ("AI-Related Feedback", "Feedback Log", "K", "countif", ["AI Assistant"]),
+        ("Bug Reports", "Feedback Log", "L", "countif", ["Bug"]),
+        ("Feature Requests", "Feedback Log", "L", "countif", ["Feature Request"]),
     ]
 
-    row_offset = 5
-    for idx, (label, formula) in enumerate(metrics):
-        ws[f"A{row_offset + idx}"] = label
-        ws[f"A{row_offset + idx}"].font = Font(bold=True)
-        ws[f"B{row_offset + idx}"] = formula
-        ws[f"B{row_offset + idx}"].font = Font(size=12, bold=True, color=COLORS["primary"])
-        ws[f"B{row_offset + idx}"].number_format = "#,##0"
-
-    # Quick Stats Section
-    ws["D4"] = "⚡ Quick Stats"
-    ws["D4"].font = Font(size=14, bold=True)
-
     quick_stats = [
-        ("Average NPS Score", "=AVERAGE('Satisfaction Survey'!E:E)"),
-        ("Overall Satisfaction", "=AVERAGE('Satisfaction Survey'!D:D)"),
-        ("AI Assistant Rating", "=AVERAGE('Satisfaction Survey'!H:H)"),
-        ("Gamification Rating", "=AVERAGE('Satisfaction Survey'!L:L)"),
+        ("Average NPS Score", "Satisfaction Survey", "E", "average", None),
+        ("Overall Satisfaction", "Satisfaction Survey", "D", "average", None),
+        ("AI Assistant Rating", "Satisfaction Survey", "H", "average", None),
+        ("Gamification Rating", "Satisfaction Survey", "L", "average", None),
     ]
 
-    for idx, (label, formula) in enumerate(quick_stats):
-        ws[f"D{row_offset + idx}"] = label
-        ws[f"D{row_offset + idx}"].font = Font(bold=True)
-        ws[f"E{row_offset + idx}"] = formula
-        ws[f"E{row_offset + idx}"].font = Font(size=12, bold=True, color=COLORS["primary"])
-        ws[f"E{row_offset + idx}"].number_format = "0.0"
+    results = {}
+    row_offset = 5
+    for column_letters, stats, style in (("AB", metrics, "Metric Count"), ("DE", quick_stats, "Metric Average")):
+        for idx, (label, sheet_name, column, aggregate, criteria) in enumerate(stats):
+            formula, value = dashboard_metric(sheet_name, column, aggregate, criteria, store[sheet_name])
+            label_cell, value_cell = (f"{letter}{row_offset + idx}" for letter in column_letters)
+            cells.append((label_cell, label, "Label"))
+            cells.append((value_cell, formula, style))
+            results.setdefault(column_letters[1], (row_offset, []))[1].append(value)
+
+    # Quick Stats Section
+    cells.append(("D4", "⚡ Quick Stats", "Section Heading"))
 
     # Instructions Section
-    ws["A15"] = "📋 How to Use This Dashboard"
-    ws["A15"].font = Font(size=12, bold=True)
+    cells.append(("A15", "📋 How to Use This Dashboard", "Subheading"))
 
     instructions = [
         "1. This dashboard auto-updates as you add feedback to the Feedback Log sheet",
         "2. Use the metrics above to track feedback trends",
-        "3. Create pivot tables for deeper analysis (Insert → Pivot Table)",
-        "4. Add charts to visualize data (Insert → Chart)",
+        "3. See the 📈 Summary sheet for breakdowns and charts (refreshed when the tracker is generated)",
+        "4. Create pivot tables for deeper analysis (Insert → Pivot Table)",
         "5. Refresh data: Data → Refresh All",
     ]
 
     for idx, instruction in enumerate(instructions):
-        ws[f"A{16 + idx}"] = instruction
-        ws[f"A{16 + idx}"].font = Font(size=10)
+        cells.append((f"A{16 + idx}", instruction, "Body"))
 
-    # Format columns
-    ws.column_dimensions["A"].width = 30
-    ws.column_dimensions["B"].width = 15
-    ws.column_dimensions["D"].width = 25
-    ws.column_dimensions["E"].width = 15
+    write_cells(ws, cells)
 
     print("   ✅ Dashboard created with summary metrics\n")
-
-
+    return results
+
+
+def dropdown_lists(dropdown):
+    """{category: [values]} in Dropdown Reference order, from its SheetData"""
+    lists = {}
+    if 0 in dropdown.codes and 1 in dropdown.codes:
+        for category, value in zip(dropdown.values(0), dropdown.values(1)):
+            if category and value:
+                lists.setdefault(category, []).append(value)
+    return lists
+
+
+def ordered_labels(preferred, seen):
+    """The preferred labels, then any other non-blank labels seen in the data"""
+    return list(preferred) + [label for label in seen if label and label not in preferred]
+
+
+def crosstab_rows(data, row_idx, col_idx, row_order, col_order):
+    """Rows of a row label x column label count table, each with its total; columns are col_order"""
+    counts = data.crosstab(row_idx, col_idx)
+    rows = []
+    for row_label in ordered_labels(row_order, data.labels[row_idx]):
+        values = [counts[row_label, col_label] for col_label in col_order]
+        rows.append([row_label, *values, sum(values)])
+    return rows
+
+
+def weekly_rows(data, idx):
+    """(week, submissions) rows from the first week with a submission to the last, empty weeks included"""
+    weeks = data.weekly_counts(idx)
+    if not weeks:
+        return []
+    week, last = min(weeks), max(weeks)
+    rows = []
+    while week <= last:
+        rows.append([week.isoformat(), weeks[week]])
+        week += timedelta(days=7)
+    return rows
+
+
+def personality_rating_rows(log, ai, order):
+    """AI Assistant Feedback responses and average ratings per AI Personality Used, joined on Feedback ID
+
+    Returns the rating column names and one [personality, responses,
+    averages...] row per personality; blank averages are None.
+    """
+    personality_idx = column_index_from_string("V") - 1
+    if not log.keys or not ai.keys or personality_idx not in log.codes:
+        return [], []
+    labels = log.labels[personality_idx]
+    personality = dict(zip(next(iter(log.keys.values())),
+                           map(labels.__getitem__, log.codes[personality_idx])))
+    keys = [personality.get(feedback_id, "") for feedback_id in next(iter(ai.keys.values()))]
+
+    ratings = sorted(ai.numbers)
+    responses = Counter(keys)
+    sums = {idx: Counter() for idx in ratings}
+    counts = {idx: Counter() for idx in ratings}
+    for idx in ratings:
+        for key, value in zip(keys, ai.numbers[idx]):
+            if not math.isnan(value):
+                sums[idx][key] += value
+                counts[idx][key] += 1
+
+    rows = []
+    for label in ordered_labels(order, responses):
+        if not responses[label]:
+            continue
+        averages = [sums[idx][label] / counts[idx][label] if counts[idx][label] else None for idx in ratings]
+        rows.append([label, responses[label], *averages])
+    return [ai.header[idx] for idx in ratings], rows
+
+
+def add_summary_chart(ws, chart, title, header_row, last_row, series_columns, anchor):
+    """Chart the series_columns (first, last) of a summary table, with column A as the categories"""
+    chart.title = title
+    # openpyxl leaves the axes hidden unless they're explicitly kept
+    chart.x_axis.delete = False
+    chart.y_axis.delete = False
+    first, last = series_columns
+    chart.add_data(Reference(ws, min_col=first, max_col=last, min_row=header_row, max_row=last_row),
+                   titles_from_data=True)
+    chart.set_categories(Reference(ws, min_col=1, min_row=header_row + 1, max_row=last_row))
+    ws.add_chart(chart, anchor)
+
+
+@stage("summary")
+def create_summary_sheet(wb, store):
+    """Summary sheet: breakdowns of the feedback as small tables, each with a native chart
+
+    The tables are aggregated from the SheetStore while generating (a pass
+    over each column's codes), so the charts read a few cells instead of
+    Excel aggregating the raw log; they refresh when the tracker is
+    regenerated.
+    """
+    print("📈 Creating Summary sheet...")
+
+    # After the Dashboard; add_instructions_sheet later puts Instructions between them
+    ws = wb.create_sheet(SUMMARY_SHEET, 1)
+    log = store["Feedback Log"]
+    lists = dropdown_lists(store["Dropdown Reference"])
+    column = {category: column_index_from_string(letter) - 1 for letter, category in DROPDOWN_COLUMNS.items()}
+
+    def stacked_bar():
+        chart = BarChart()
+        chart.type = "col"
+        chart.grouping = "stacked"
+        chart.overlap = 100
+        return chart
+
+    def ratings_bar():
+        chart = BarChart()
+        chart.type = "col"
+        chart.y_axis.scaling.min = 0
+        chart.y_axis.scaling.max = 5
+        return chart
+
+    # (title, header, rows, number style per value column, chart, series columns)
+    blocks = []
+    for row_category, col_category in (("Feature/Module", "Priority"), ("Assigned To", "Status")):
+        row_idx, col_idx = column[row_category], column[col_category]
+        if row_idx not in log.codes or col_idx not in log.codes:
+            continue
+        col_order = ordered_labels(lists.get(col_category, []), log.labels[col_idx])
+        rows = crosstab_rows(log, row_idx, col_idx, lists.get(row_category, []), col_order)
+        header = [row_category, *col_order, "Total"]
+        blocks.append((f"{col_category} by {row_category}", header, rows, ["Count"] * (len(header) - 1),
+                       stacked_bar(), (2, len(col_order) + 1)))
+
+    submitted = log.header.index("Submission Date") if "Submission Date" in log.header else None
+    if submitted in log.codes:
+        blocks.append(("Weekly Submissions", ["Week Starting", "Submissions"], weekly_rows(log, submitted),
+                       ["Count"], LineChart(), (2, 2)))
+
+    ratings, rows = personality_rating_rows(log, store["AI Assistant Feedback"], lists.get("AI Personality", []))
+    if ratings:
+        blocks.append(("AI Ratings by Personality", ["AI Personality Used", "Responses", *ratings], rows,
+                       ["Count"] + ["Average"] * len(ratings), ratings_bar(), (3, len(ratings) + 2)))
+
+    # Column widths go ahead of the rows in write-only mode
+    ws.column_dimensions["A"].width = 24
+    for col_idx in range(2, max((len(header) for _, header, *_ in blocks), default=1) + 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = 14
+
+    cells = [
+        ("A1", "📈 OrokiiPay Feedback Summary", "Dashboard Title"),
+        ("A2", f"Computed from the CSV data on {datetime.now().strftime('%Y-%m-%d %H:%M')} - "
+               "re-run the generator to refresh", "Timestamp"),
+    ]
+    top = 4
+    for title, header, rows, styles, chart, series_columns in blocks:
+        cells.append((f"A{top}", title, "Subheading"))
+        for col_idx, name in enumerate(header, start=1):
+            cells.append((f"{get_column_letter(col_idx)}{top + 1}", name, "Header"))
+        for row_offset, row in enumerate(rows, start=2):
+            cells.append((f"A{top + row_offset}", row[0], "Label"))
+            for col_idx, (value, style) in enumerate(zip(row[1:], styles), start=2):
+                cells.append((f"{get_column_letter(col_idx)}{top + row_offset}", value, style))
+
+        if rows:
+            add_summary_chart(ws, chart, title, top + 1, top + 1 + len(rows), series_columns,
+                              f"{get_column_letter(len(header) + 2)}{top}")
+        print(f"   ✅ {title} ({len(rows)} rows)")
+        # Leave room for the chart (about 15 rows high) before the next table
+        top += max(len(rows) + 3, 17)
+
+    write_cells(ws, cells)
+    print("   ✅ Summary sheet created\n")
+
+
+@stage("protection")
 def protect_dropdown_sheet(ws):
     """Protect the Dropdown Reference sheet"""
     print("🔒 Protecting Dropdown Reference sheet...")
@@ -409,20 +1073,23 @@ def protect_dropdown_sheet(ws):
     print("   ✅ Sheet protected\n")
 
 
+@stage("instructions")
 def add_instructions_sheet(wb):
     """Add a quick start instructions sheet"""
     print("📖 Creating Instructions sheet...")
 
     ws = wb.create_sheet("📖 Instructions", 1)  # Insert as second sheet
 
+    # Format columns
+    ws.column_dimensions["A"].width = 50
+    ws.column_dimensions["B"].width = 40
+
     # Title
-    ws["A1"] = "📖 Quick Start Guide - User Feedback Template"
-    ws["A1"].font = Font(size=16, bold=True, color=COLORS["primary"])
-    ws.merge_cells("A1:D1")
+    cells = [("A1", "📖 Quick Start Guide - User Feedback Template", "Guide Title")]
+    merge_cells(ws, "A1:D1")
 
     # For Users Section
-    ws["A3"] = "👤 For Users Submitting Feedback:"
-    ws["A3"].font = Font(size=12, bold=True)
+    cells.append(("A3", "👤 For Users Submitting Feedback:", "Subheading"))
 
     user_instructions = [
         "1. Go to the 'Feedback Log' sheet",
@@ -439,12 +1106,10 @@ def add_instructions_sheet(wb):
     ]
 
     for idx, instruction in enumerate(user_instructions):
-        ws[f"A{4 + idx}"] = instruction
-        ws[f"A{4 + idx}"].font = Font(size=10)
+        cells.append((f"A{4 + idx}", instruction, "Body"))
 
     # For Team Section
-    ws["A17"] = "👥 For Product/Development Team:"
-    ws["A17"].font = Font(size=12, bold=True)
+    cells.append(("A17", "👥 For Product/Development Team:", "Subheading"))
 
     team_instructions = [
         "1. Review 'Dashboard' sheet for summary metrics",
@@ -464,15 +1129,14 @@ def add_instructions_sheet(wb):
     ]
 
     for idx, instruction in enumerate(team_instructions):
-        ws[f"A{18 + idx}"] = instruction
-        ws[f"A{18 + idx}"].font = Font(size=10)
+        cells.append((f"A{18 + idx}", instruction, "Body"))
 
     # Sheet Guide
-    ws["A35"] = "📑 Sheet Guide:"
-    ws["A35"].font = Font(size=12, bold=True)
+    cells.append(("A35", "📑 Sheet Guide:", "Subheading"))
 
     sheet_guide = [
         ("Dashboard", "Summary metrics and quick stats"),
+        (SUMMARY_SHEET, "Breakdowns and charts of the feedback"),
         ("Feedback Log", "Main feedback collection (start here!)"),
         ("AI Assistant Feedback", "Detailed AI performance metrics"),
         ("Feature Requests", "New features with voting"),
@@ -481,119 +1145,450 @@ def add_instructions_sheet(wb):
         ("Dropdown Reference", "Master dropdown values (protected)"),
     ]
 
-    ws["A36"] = "Sheet Name"
-    ws["B36"] = "Purpose"
-    ws["A36"].font = Font(bold=True)
-    ws["B36"].font = Font(bold=True)
+    cells.append(("A36", "Sheet Name", "Label"))
+    cells.append(("B36", "Purpose", "Label"))
 
     for idx, (sheet, purpose) in enumerate(sheet_guide):
-        ws[f"A{37 + idx}"] = sheet
-        ws[f"B{37 + idx}"] = purpose
+        cells.append((f"A{37 + idx}", sheet, None))
+        cells.append((f"B{37 + idx}", purpose, None))
 
     # Support Section
-    ws["A46"] = "❓ Need Help?"
-    ws["A46"].font = Font(size=12, bold=True)
+    cells.append(("A46", "❓ Need Help?", "Subheading"))
 
-    ws["A47"] = "📧 Email: development@orokiipay.com"
-    ws["A48"] = "📚 Docs: See USER_FEEDBACK_TEMPLATE.md in docs/ folder"
-    ws["A49"] = "🔧 Setup: See FEEDBACK_TEMPLATE_SETUP_GUIDE.md"
+    cells.append(("A47", "📧 Email: development@orokiipay.com", None))
+    cells.append(("A48", "📚 Docs: See USER_FEEDBACK_TEMPLATE.md in docs/ folder", None))
+    cells.append(("A49", "🔧 Setup: See FEEDBACK_TEMPLATE_SETUP_GUIDE.md", None))
 
-    # Format columns
-    ws.column_dimensions["A"].width = 50
-    ws.column_dimensions["B"].width = 40
+    write_cells(ws, cells)
 
     print("   ✅ Instructions sheet created\n")
 
 
-def main():
-    """Main function"""
-    print_header()
+def read_header(csv_path):
+    """Header row of a CSV"""
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
 
-    # Check CSV files exist
-    check_csv_files()
 
-    # Create workbook
-    wb = create_workbook()
+def build_sheet(wb, sheet_name, csv_file, data):
+    """Import one CSV sheet and add its validation, conditional formatting and protection"""
+    ws = import_csv_to_sheet(wb, sheet_name, csv_file, data)
+
+    # Add data validation to Feedback Log
+    add_data_validation(ws, sheet_name)
+
+    # Add conditional formatting
+    add_conditional_formatting(ws, sheet_name)
+
+    # Protect Dropdown Reference sheet
+    if sheet_name == "Dropdown Reference":
+        protect_dropdown_sheet(ws)
+    return ws
+
 
-    # Import all CSV files as sheets
-    sheets = {}
+def build_sheet_part(sheet_name, csv_file, stream, work_dir):
+    """Pool worker: build one sheet in a workbook of its own, saved under work_dir
+
+    Returns (sheet name, archive path, part name, table range, SheetData,
+    printed output, STAGE_METRICS) for build_workbook to splice in; the
+    SheetData goes into the main process's store, so the CSV isn't loaded
+    twice.
+    """
+    # Pool workers are reused, and forked with the main process's metrics
+    STAGE_METRICS.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        wb = create_workbook(write_only=stream)
+
+    output = io.StringIO()
+    data = load_sheet_data(sheet_name)
+    with contextlib.redirect_stdout(output):
+        ws = build_sheet(wb, sheet_name, csv_file, data)
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx", dir=work_dir)
+    os.close(fd)
+    wb.save(path)
+    table_ref = ws.tables[table_name(sheet_name)].ref
+    return sheet_name, path, ws.path.lstrip("/"), table_ref, data, output.getvalue(), dict(STAGE_METRICS)
+
+
+def build_workbook(stream=False, reused=None, jobs=1, work_dir=None):
+    """Build the tracker workbook; stream builds it write-only with flat memory use
+
+    Sheets in reused (name -> previous manifest entry) come from the previous
+    build. With jobs > 1 the remaining CSV sheets are built in worker
+    processes, each saving a one-sheet workbook under work_dir. Both kinds are
+    left as empty placeholders that only carry their table, whose part and
+    relationship are written by this workbook.
+
+    Every stage works from one SheetStore, so each CSV is loaded at most
+    once; reused sheets are only loaded if the dashboard or named ranges
+    need them.
+
+    Returns the workbook, {sheet name: (archive path, part name)} for
+    save_workbook to splice in, and the formula results it should cache.
+    """
+    reused = reused or {}
+    sources = {name: (OUTPUT_FILE, entry["part"]) for name, entry in reused.items()}
+    tables = {name: entry["table"] for name, entry in reused.items()}
+    store = SheetStore()
+    outputs = {}
+
+    pending = [(name, csv_file) for name, csv_file in CSV_FILES.items() if name not in reused]
+    if jobs > 1 and len(pending) > 1:
+        with Pool(processes=min(jobs, len(pending))) as pool:
+            results = pool.starmap(build_sheet_part, [(name, csv_file, stream, work_dir) for name, csv_file in pending])
+        for name, path, part, table_ref, data, output, metrics in results:
+            sources[name] = (path, part)
+            tables[name] = table_ref
+            store[name] = data
+            outputs[name] = output
+            merge_stage_metrics(metrics)
+
+    wb = create_workbook(write_only=stream)
+
+    # Import and format all CSV files as sheets
     for sheet_name, csv_file in CSV_FILES.items():
-        ws = import_csv_to_sheet(wb, sheet_name, csv_file)
-        sheets[sheet_name] = ws
-
-    print("\n" + "=" * 70)
-    print("🎨 Applying Formatting...")
-    print("=" * 70 + "\n")
-
-    # Apply formatting to all sheets
-    for sheet_name, ws in sheets.items():
-        print(f"Formatting: {sheet_name}")
-        format_header_row(ws)
-        apply_alternate_row_colors(ws)
-        auto_fit_columns(ws)
-        freeze_header_row(ws)
-        add_filters(ws)
-        print()
+        if sheet_name not in sources:
+            build_sheet(wb, sheet_name, csv_file, store[sheet_name])
+            continue
+
+        if sheet_name in reused:
+            print(f"♻️  Reusing {sheet_name} (unchanged)")
+        else:
+            print(outputs[sheet_name], end="")
+        headers = table_headers(sheet_name, read_header(DOCS_DIR / csv_file))
+        add_sheet_table(wb.create_sheet(title=sheet_name), headers, tables[sheet_name])
+    print()
 
     # Create Dashboard
-    create_dashboard_sheet(wb)
+    cached = {"Dashboard": create_dashboard_sheet(wb, store)}
+    create_summary_sheet(wb, store)
+
+    # A reused Feedback Log already has its scores stored
+    if "Feedback Log" not in reused:
+        cached["Feedback Log"] = {get_column_letter(PRIORITY_COLUMN): (2, priority_scores(store["Feedback Log"]))}
+
+    # Every formula cell gets its result cached, so there's no need to
+    # recalculate the whole workbook when it is opened
+    wb.calculation.fullCalcOnLoad = False
 
     # Add Instructions
     add_instructions_sheet(wb)
 
     # Create named ranges
-    create_named_ranges(wb)
+    create_named_ranges(wb, store["Dropdown Reference"])
+    return wb, sources, cached
 
-    # Add data validation to Feedback Log
-    add_data_validation(sheets["Feedback Log"], "Feedback Log")
 
-    # Add formulas
-    add_priority_formula(sheets["Feedback Log"], "Feedback Log")
+def manifest_path():
+    """The manifest lives next to the workbook it describes"""
+    return OUTPUT_FILE.with_name(OUTPUT_FILE.stem + ".manifest.json")
 
-    # Add conditional formatting
-    add_conditional_formatting(sheets["Feedback Log"], "Feedback Log")
 
-    # Protect Dropdown Reference sheet
-    protect_dropdown_sheet(sheets["Dropdown Reference"])
+@stage("hash")
+def file_sha256(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    # Save workbook
-    print("=" * 70)
-    print("💾 Saving Excel Workbook...")
-    print("=" * 70 + "\n")
 
+def generator_hashes():
+    """SHA-256 of the generator and of feedback_csv.py, whose sheet layout it builds"""
+    return [file_sha256(__file__), file_sha256(feedback_csv.__file__)]
+
+
+def load_manifest():
+    """The previous build's manifest, or None if it can't be trusted
+
+    The manifest is ignored if the generator or feedback_csv.py changed, or if the workbook
+    was modified or replaced after the manifest was written.
+    """
     try:
-        wb.save(OUTPUT_FILE)
-        print(f"✅ Success! Workbook saved to:")
+        with open(manifest_path(), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        stat = OUTPUT_FILE.stat()
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("generator") != generator_hashes():
+        return None
+    if manifest.get("output") != [stat.st_size, stat.st_mtime_ns]:
+        return None
+    return manifest
+
+
+def unchanged_sheets(manifest, hashes):
+    """Manifest entries of the sheets whose CSV hash matches the previous build"""
+    if not manifest:
+        return {}
+    previous = manifest.get("sheets", {})
+    return {name: previous[name] for name, digest in hashes.items()
+            if previous.get(name, {}).get("sha256") == digest}
+
+
+def relationships(archive, part):
+    """(id, type) of each relationship of a part in an open archive; targets are ignored"""
+    folder, name = part.rsplit("/", 1)
+    try:
+        rels = ElementTree.fromstring(archive.read(f"{folder}/_rels/{name}.rels"))
+    except KeyError:
+        return set()
+    return {(rel.get("Id"), rel.get("Type")) for rel in rels}
+
+
+# A formula cell as openpyxl writes it: plain or shared formula, empty cached value
+FORMULA_CELL = re.compile(rb'(<c r="([A-Z]+)(\d+)"[^>]*)>(<f[^>]*/>|<f[^>]*>[^<]*</f>)<v\s*/></c>')
+
+
+def cache_formula_results(src, dst, results):
+    """Copy a sheet part from src to dst, filling in the cached <v> of its formula cells
+
+    openpyxl only writes the formula. results maps column letters to
+    (first row, values), each value a number or an Excel error string. The
+    part is streamed in chunks cut after a cell, so memory stays flat.
+    """
+    def fill(match):
+        first_row, values = results.get(match.group(2).decode(), (0, ()))
+        idx = int(match.group(3)) - first_row
+        if not first_row or not 0 <= idx < len(values):
+            return match.group(0)
+        value = values[idx]
+        if isinstance(value, str):
+            return b'%s t="e">%s<v>%s</v></c>' % (match.group(1), match.group(4), value.encode("utf-8"))
+        return b'%s>%s<v>%s</v></c>' % (match.group(1), match.group(4), repr(value).encode("ascii"))
+
+    pending = b""
+    for chunk in iter(lambda: src.read(1 << 20), b""):
+        pending += chunk
+        cut = pending.rfind(b"</c>")
+        if cut < 0:
+            continue
+        cut += len(b"</c>")
+        dst.write(FORMULA_CELL.sub(fill, pending[:cut]))
+        pending = pending[cut:]
+    dst.write(FORMULA_CELL.sub(fill, pending))
+
+
+@stage("save", bytes_written=lambda parts: OUTPUT_FILE.stat().st_size if parts is not None else 0)
+def save_workbook(wb, sources=None, cached=None):
+    """Save wb atomically to OUTPUT_FILE, splicing in sheet parts built elsewhere
+
+    sources maps sheet names to (archive path, part name) of a previous build
+    or a worker; cached maps sheet names to formula results to store with
+    their formulas (see cache_formula_results), including in spliced parts.
+    Returns {sheet name: part name} for the new workbook, or None when a part
+    can't be spliced in safely (its styles.xml differs, or its relationships
+    don't match its placeholder's); the caller then does a full build.
+    """
+    sources = sources or {}
+    fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=OUTPUT_FILE.parent)
+    os.close(fd)
+    try:
+        wb.save(tmp_path)
+        parts = {ws.title: ws.path.lstrip("/") for ws in wb.worksheets}
+
+        if sources or cached:
+            replace = {parts[name]: source for name, source in sources.items()}
+            results = {parts[name]: values for name, values in (cached or {}).items() if values}
+            spliced_path = tmp_path + ".splice"
+            with zipfile.ZipFile(tmp_path) as new:
+                styles = new.read("xl/styles.xml")
+                for archive_path in {archive_path for archive_path, _ in sources.values()}:
+                    with zipfile.ZipFile(archive_path) as archive:
+                        # Spliced parts refer to cell formats and conditional formats by index
+                        if archive.read("xl/styles.xml") != styles:
+                            return None
+                        names = set(archive.namelist())
+                        for target, (source_path, part) in replace.items():
+                            # The spliced part refers to related parts (its table) by relationship id
+                            if source_path == archive_path and (
+                                    part not in names or relationships(archive, part) != relationships(new, target)):
+                                return None
+
+                # Every entry is streamed across in chunks, so no part is ever
+                # held in memory whole
+                with zipfile.ZipFile(spliced_path, 'w', zipfile.ZIP_DEFLATED) as out:
+                    for item in new.infolist():
+                        with contextlib.ExitStack() as stack:
+                            if item.filename in replace:
+                                archive_path, part = replace[item.filename]
+                                src = stack.enter_context(zipfile.ZipFile(archive_path)).open(part)
+                            else:
+                                src = new.open(item)
+                            stack.enter_context(src)
+                            # Only spliced and rewritten parts change size; the rest keep it
+                            changed = item.filename in replace or item.filename in results
+                            dst = stack.enter_context(out.open(item, 'w', force_zip64=changed))
+                            if item.filename in results:
+                                cache_formula_results(src, dst, results[item.filename])
+                            else:
+                                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(spliced_path, tmp_path)
+
+        os.replace(tmp_path, OUTPUT_FILE)
+        return parts
+    finally:
+        for path in (tmp_path, tmp_path + ".splice"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+@stage("manifest", bytes_written=lambda _: manifest_path().stat().st_size)
+def write_manifest(wb, hashes, parts):
+    """Record the CSV hashes, sheet parts and table ranges of the workbook just saved"""
+    stat = OUTPUT_FILE.stat()
+    manifest = {
+        "generator": generator_hashes(),
+        "output": [stat.st_size, stat.st_mtime_ns],
+        "sheets": {
+            name: {"sha256": digest, "part": parts[name], "table": wb[name].tables[table_name(name)].ref}
+            for name, digest in hashes.items()
+        },
+    }
+    with open(manifest_path(), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the OrokiiPay User Feedback Tracker workbook.")
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Build in write-only mode with flat memory use (for very large feedback logs)",
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="Ignore the manifest and rebuild every sheet",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Build the CSV sheets in this many worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true",
+        help="Don't print progress (errors still go to stderr)",
+    )
+    parser.add_argument(
+        "--profile", metavar="FILE",
+        help="Write cProfile stats for the run to FILE (read them with pstats)",
+    )
+    parser.add_argument(
+        "--metrics", choices=["json"],
+        help="Print per-stage wall time, rows processed and bytes written when done "
+             "(progress then goes to stderr)",
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Only check the CSV templates (headers, dropdown values, row counts); doesn't need openpyxl",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+    if args.check:
+        if check_csvs(DOCS_DIR):
+            sys.exit(1)
+        return
+
+    STAGE_METRICS.clear()
+    profiler = cProfile.Profile() if args.profile else None
+    start = time.perf_counter()
+    try:
+        with contextlib.ExitStack() as stack:
+            if args.quiet:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+            elif args.metrics:
+                # Keep stdout for the metrics alone, so they can be piped (e.g. to jq)
+                stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+            if profiler is not None:
+                profiler.enable()
+            generate(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+
+    if args.metrics == "json":
+        # Worker processes' stages are included, so with -j they can add up to more than the total
+        print(json.dumps({
+            "output": str(OUTPUT_FILE),
+            "stream": args.stream,
+            "jobs": args.jobs,
+            "seconds": time.perf_counter() - start,
+            "stages": STAGE_METRICS,
+        }, indent=2))
+
+
+def generate(args):
+    """Check the CSVs and build the workbook if any of them changed"""
+    print_header()
+
+    # Check CSV files exist
+    check_csv_files()
+
+    # Work out which sheets changed since the last build
+    hashes = {sheet_name: file_sha256(DOCS_DIR / csv_file) for sheet_name, csv_file in CSV_FILES.items()}
+    manifest = None if args.full else load_manifest()
+    reused = unchanged_sheets(manifest, hashes)
+    if set(reused) == set(CSV_FILES):
+        print("✨ No CSV changes since the last build - workbook is up to date:")
         print(f"   📁 {OUTPUT_FILE}")
-        print()
+        return
 
-        # Calculate file size
-        file_size = OUTPUT_FILE.stat().st_size
-        file_size_kb = file_size / 1024
-        print(f"📊 File size: {file_size_kb:.1f} KB")
-        print(f"📋 Total sheets: {len(wb.sheetnames)}")
-        print()
+    # Worker-built sheets are kept here until they are spliced into the output
+    work_dir = tempfile.mkdtemp(prefix="feedback-sheets-")
+    try:
+        wb, sources, cached = build_workbook(stream=args.stream, reused=reused, jobs=args.jobs, work_dir=work_dir)
 
+        # Save workbook
         print("=" * 70)
-        print("🎉 Template Generation Complete!")
-        print("=" * 70)
-        print()
-        print("📌 Next Steps:")
-        print("   1. Open the Excel file")
-        print("   2. Review the 📖 Instructions sheet")
-        print("   3. Check the Dashboard for sample metrics")
-        print("   4. Share with your team")
-        print("   5. Start collecting feedback!")
-        print()
-        print("📚 For detailed documentation, see:")
-        print("   • USER_FEEDBACK_TEMPLATE.md")
-        print("   • FEEDBACK_TEMPLATE_SETUP_GUIDE.md")
-        print("   • FEEDBACK_SYSTEM_README.md")
-        print()
+        print("💾 Saving Excel Workbook...")
+        print("=" * 70 + "\n")
 
-    except Exception as e:
-        print(f"❌ Error saving workbook: {e}")
-        sys.exit(1)
+        try:
+            parts = save_workbook(wb, sources, cached)
+            if parts is None:
+                print("⚠️  Sheets built elsewhere can't be spliced in - rebuilding everything\n")
+                wb, _, cached = build_workbook(stream=args.stream)
+                parts = save_workbook(wb, cached=cached)
+            write_manifest(wb, hashes, parts)
+            print(f"✅ Success! Workbook saved to:")
+            print(f"   📁 {OUTPUT_FILE}")
+            print()
+
+            # Calculate file size
+            file_size = OUTPUT_FILE.stat().st_size
+            file_size_kb = file_size / 1024
+            print(f"📊 File size: {file_size_kb:.1f} KB")
+            print(f"📋 Total sheets: {len(wb.sheetnames)}")
+            print()
+
+            print("=" * 70)
+            print("🎉 Template Generation Complete!")
+            print("=" * 70)
+            print()
+            print("📌 Next Steps:")
+            print("   1. Open the Excel file")
+            print("   2. Review the 📖 Instructions sheet")
+            print("   3. Check the Dashboard for sample metrics")
+            print("   4. Share with your team")
+            print("   5. Start collecting feedback!")
+            print()
+            print("📚 For detailed documentation, see:")
+            print("   • USER_FEEDBACK_TEMPLATE.md")
+            print("   • FEEDBACK_TEMPLATE_SETUP_GUIDE.md")
+            print("   • FEEDBACK_SYSTEM_README.md")
+            print()
+
+        except Exception as e:
+            print(f"❌ Error saving workbook: {e}", file=sys.stderr)
+            sys.exit(1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
 
 
 if __name__ == "__main__":
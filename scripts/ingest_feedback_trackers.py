@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+OrokiiPay User Feedback Tracker Ingestion
+
+Merges filled-in copies of OrokiiPay_User_Feedback_Tracker.xlsx back into the
+master CSV templates that generate_feedback_template.py builds the tracker
+from.
+
+- Trackers are read with openpyxl's read-only loader, one row at a time, so
+  memory doesn't grow with the size or number of workbooks
+- Columns are matched to the master CSV by header name
+- Feedback Log dropdown columns are checked against the master Dropdown
+  Reference; rows with a value that isn't listed are rejected and reported
+- Rows are deduplicated by their ID (the first column): the master CSV and
+  earlier trackers win, so re-submitted rows are skipped
+- New rows are staged in temporary files and only appended to the master CSVs
+  once every tracker has been read
+
+Usage:
+    python ingest_feedback_trackers.py TRACKER.xlsx [TRACKER.xlsx ...] [--dry-run] [-j JOBS]
+
+    --dry-run validates and reports without touching the master CSVs.
+
+    -j/--jobs reads the trackers in parallel worker processes; rows are still
+    merged in command-line order, so the result is the same.
+
+    Run generate_feedback_template.py afterwards; only the sheets whose CSV
+    gained rows are rebuilt.
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, time
+from multiprocessing import Pool
+from pathlib import Path
+
+from openpyxl import load_workbook
+from openpyxl.utils.cell import column_index_from_string
+
+from feedback_csv import CSV_FILES, DOCS_DIR, DROPDOWN_COLUMNS
+
+
+def read_dropdown_values():
+    """{category: {case-folded value: value}} from the master Dropdown Reference CSV"""
+    values = {}
+    with open(DOCS_DIR / CSV_FILES["Dropdown Reference"], 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) >= 2 and row[0] and row[1]:
+                values.setdefault(row[0], {})[row[1].casefold()] = row[1]
+    return values
+
+
+def csv_value(value):
+    """A cell value as the master CSVs write it"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, datetime):
+        if value.time() == time():
+            return value.strftime("%Y-%m-%d")
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def tracker_columns(header, tracker_header):
+    """Position of each master header column in a tracker's header row, or None if it's missing"""
+    positions = {}
+    for col_idx, name in enumerate(tracker_header):
+        if name is not None:
+            positions.setdefault(str(name).strip(), col_idx)
+    return [positions.get(name) for name in header]
+
+
+class SheetMerge:
+    """Rows merged into one master CSV: its header, the IDs seen so far and the staged new rows"""
+
+    def __init__(self, sheet_name, dropdown_values):
+        self.sheet_name = sheet_name
+        self.csv_path = DOCS_DIR / CSV_FILES[sheet_name]
+        self.ids = set()
+        with open(self.csv_path, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            self.header = next(reader, [])
+            for row in reader:
+                if row and row[0]:
+                    self.ids.add(row[0].strip())
+
+        # Column index: {case-folded value: value} for the columns with a dropdown
+        self.allowed = {}
+        if sheet_name == "Feedback Log":
+            for col_letter, category in DROPDOWN_COLUMNS.items():
+                col_idx = column_index_from_string(col_letter) - 1
+                if col_idx < len(self.header):
+                    self.allowed[col_idx] = dropdown_values.get(category, {})
+
+        self.staged = tempfile.TemporaryFile(mode="w+", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.staged, lineterminator="\n")
+        self.added = 0
+        self.duplicates = 0
+        self.rejected = 0
+
+    def problems(self, row):
+        """Reasons a row can't be merged, empty if it's fine; dropdown values are normalised in place"""
+        if not row[0]:
+            return [f"no {self.header[0]}"]
+        problems = []
+        for col_idx, allowed in self.allowed.items():
+            value = row[col_idx]
+            if not value:
+                continue
+            label = allowed.get(value.casefold())
+            if label is None:
+                problems.append(f"{self.header[col_idx]} '{value}' is not in the Dropdown Reference")
+            else:
+                row[col_idx] = label
+        return problems
+
+    def add(self, row, source):
+        """Stage a row unless its ID was already seen or it's invalid"""
+        if row[0] in self.ids:
+            self.duplicates += 1
+            return
+        problems = self.problems(row)
+        if problems:
+            self.rejected += 1
+            print(f"   ⚠️  {source}: {'; '.join(problems)}")
+            return
+        self.ids.add(row[0])
+        self.writer.writerow(row)
+        self.added += 1
+
+    def commit(self):
+        """Append the staged rows to the master CSV"""
+        if self.added:
+            needs_newline = False
+            with open(self.csv_path, 'rb') as f:
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b"\n"
+            self.staged.seek(0)
+            with open(self.csv_path, 'a', encoding='utf-8', newline='') as f:
+                if needs_newline:
+                    f.write("\n")
+                shutil.copyfileobj(self.staged, f)
+        self.staged.close()
+
+
+def read_tracker(path, headers, work_dir):
+    """Pool worker: stream one tracker's CSV-backed sheets into CSV files under work_dir
+
+    Each row is laid out like its master CSV (headers maps sheet name to the
+    master header) and prefixed with its row number in the tracker; empty
+    rows are dropped. Returns (tracker path, {sheet name: (CSV path, row count)}).
+    """
+    sheets = {}
+    # data_only gives the values Excel cached for formulas, like the Priority Score
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet_name, header in headers.items():
+            if sheet_name not in wb.sheetnames:
+                continue
+            rows = wb[sheet_name].iter_rows(values_only=True)
+            columns = tracker_columns(header, next(rows, ()))
+            fd, csv_path = tempfile.mkstemp(suffix=".csv", dir=work_dir)
+            count = 0
+            with open(fd, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f, lineterminator="\n")
+                for row_idx, values in enumerate(rows, start=2):
+                    row = [csv_value(values[col_idx]) if col_idx is not None and col_idx < len(values) else ""
+                           for col_idx in columns]
+                    if any(row):
+                        writer.writerow([row_idx] + row)
+                        count += 1
+            sheets[sheet_name] = (csv_path, count)
+    finally:
+        wb.close()
+    return path, sheets
+
+
+def merge_tracker(path, sheets, merges):
+    """Feed the rows read_tracker wrote for one tracker to their SheetMerge"""
+    print(f"📥 Merging {path.name}...")
+    for sheet_name, (csv_path, count) in sheets.items():
+        merge = merges[sheet_name]
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            for row_idx, *row in csv.reader(f):
+                merge.add(row, f"{path.name} {sheet_name} row {row_idx}")
+        os.remove(csv_path)
+        print(f"   ✅ {sheet_name}: {count} rows")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Merge filled-in feedback trackers into the master CSVs.")
+    parser.add_argument("trackers", nargs="+", type=Path, metavar="TRACKER", help="Tracker workbooks to merge")
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Validate and report without changing the master CSVs",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Read the trackers in this many worker processes (default: 1)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+
+    missing = [path for path in args.trackers if not path.is_file()]
+    if missing:
+        for path in missing:
+            print(f"❌ Tracker not found: {path}")
+        sys.exit(1)
+
+    dropdown_values = read_dropdown_values()
+    merges = {sheet_name: SheetMerge(sheet_name, dropdown_values)
+              for sheet_name in CSV_FILES if sheet_name != "Dropdown Reference"}
+    headers = {sheet_name: merge.header for sheet_name, merge in merges.items()}
+
+    # Trackers are read into CSV files here, then merged in command-line order
+    work_dir = tempfile.mkdtemp(prefix="feedback-ingest-")
+    try:
+        tasks = [(path, headers, work_dir) for path in args.trackers]
+        if args.jobs > 1 and len(tasks) > 1:
+            with Pool(processes=min(args.jobs, len(tasks))) as pool:
+                results = pool.starmap(read_tracker, tasks)
+        else:
+            results = (read_tracker(*task) for task in tasks)
+        for path, sheets in results:
+            merge_tracker(path, sheets, merges)
+        print()
+
+        for merge in merges.values():
+            print(f"📋 {merge.sheet_name}: {merge.added} new, {merge.duplicates} duplicates, "
+                  f"{merge.rejected} rejected")
+            if not args.dry_run:
+                merge.commit()
+    finally:
+        for merge in merges.values():
+            merge.staged.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print()
+    if args.dry_run:
+        print("🔍 Dry run - master CSVs unchanged")
+    elif any(merge.added for merge in merges.values()):
+        print("✅ Master CSVs updated - run generate_feedback_template.py to rebuild the tracker")
+    else:
+        print("✨ No new rows to merge")
+
+
+if __name__ == "__main__":
+    main()